@@ -4,45 +4,273 @@ AI communication and prompt management using Ollama.
 Supports both strict SQL mode and conversational chat mode.
 """
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import httpx
 import ollama
 import config
 from validator import extract_sql
+from semantic_cache import LLMCache
 
 
-def mindsql_start(messages: list) -> str:
+# ── Shared HTTP client ────────────────────────────────────────────────────────
+# One keep-alive connection pool for every call instead of a fresh client
+# (and TCP handshake) per request. Generation can be slow, so only the
+# connect phase gets a tight timeout.
+_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+_CLIENT = ollama.Client(
+    host=config.OLLAMA_HOST,
+    timeout=_TIMEOUT,
+    transport=httpx.HTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+    ),
+)
+
+# ── Generation options ────────────────────────────────────────────────────────
+# Prompts put the static parts (system instruction, schema) first and the
+# question last; with a stable num_ctx and keep_alive, Ollama reuses the
+# KV cache for that shared prefix instead of re-prefilling the schema.
+SQL_OPTIONS = {
+    "temperature": 0.2,    # Low temp for deterministic SQL
+    "num_predict": 250,    # Enough for complex queries
+    "top_p": 0.9,
+    "repeat_penalty": 1.1, # Prevent hallucination loops
+    "num_ctx": config.NUM_CTX,
+}
+CHAT_OPTIONS = {
+    "temperature": 0.5,    # Slightly more creative for explanations
+    "num_predict": 512,
+    "repeat_penalty": 1.1,
+    "num_ctx": config.NUM_CTX,
+}
+
+# ── Cache-key serialisation ───────────────────────────────────────────────────
+# Keys hash the full message list (schema included), so serialisation speed
+# matters; orjson is a C extension, stdlib json is the fallback.
+if orjson is not None:
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+
+# ── Exact-match cache (only for near-deterministic temperatures) ─────────────
+_EXACT_CACHE: OrderedDict[str, str] = OrderedDict()
+_EXACT_CACHE_MAX_TEMP = 0.2
+# Guards _EXACT_CACHE and _PENDING; generation is on the main thread today,
+# but accept_sql/reject_sql stay safe to call from any thread
+_CACHE_LOCK = threading.Lock()
+
+
+def _exact_key(messages: list, options: dict) -> str | None:
+    """Hash of model + messages + options, or None if output isn't deterministic enough."""
+    if options.get("temperature", 1.0) > _EXACT_CACHE_MAX_TEMP:
+        return None
+    payload = {"m": config.MODEL_NAME, "msgs": messages, "opts": options}
+    return hashlib.sha256(_dumps(payload)).hexdigest()
+
+
+def _exact_get(key: str | None) -> str | None:
+    if key is None:
+        return None
+    with _CACHE_LOCK:
+        if key not in _EXACT_CACHE:
+            return None
+        _EXACT_CACHE.move_to_end(key)
+        return _EXACT_CACHE[key]
+
+
+def _exact_put(key: str | None, value: str):
+    if key is None or value.startswith("CLARIFICATION_NEEDED:"):
+        return
+    with _CACHE_LOCK:
+        _EXACT_CACHE[key] = value
+        _EXACT_CACHE.move_to_end(key)
+        while len(_EXACT_CACHE) > config.EXACT_CACHE_SIZE:
+            _EXACT_CACHE.popitem(last=False)
+
+
+def _exact_discard(key: str | None):
+    if key is not None:
+        with _CACHE_LOCK:
+            _EXACT_CACHE.pop(key, None)
+
+
+def _embed(text: str) -> list[float]:
+    return _CLIENT.embeddings(model=config.EMBED_MODEL, prompt=text)["embedding"]
+
+
+def _cache_disabled(exc: Exception):
+    from ui import console
+    console.print(
+        f"[yellow]⚠ Semantic cache off for this session – embedding model "
+        f"'{config.EMBED_MODEL}' unavailable ({exc}). "
+        f"Run: ollama pull {config.EMBED_MODEL}[/yellow]"
+    )
+
+
+_SEMANTIC_CACHE = LLMCache(
+    config.CACHE_FILE,
+    _embed,
+    threshold=config.SEMANTIC_CACHE_THRESHOLD,
+    capacity=config.SEMANTIC_CACHE_SIZE,
+    on_disable=_cache_disabled,
+)
+
+
+def _cache_parts(messages: list) -> tuple[str, str]:
     """
-    Sends messages to Ollama in strict/SQL mode.
-    Returns clean SQL or a CLARIFICATION_NEEDED string.
+    Splits a message list into (scope, question) for the semantic cache.
+    The last paragraph of the final message is the question; everything
+    before it (model, instructions, schema) scopes the cache entry.
     """
-    try:
-        response = ollama.chat(
-            model=config.MODEL_NAME,
-            messages=messages,
-            options={
-                "temperature": 0.2,    # Low temp for deterministic SQL
-                "num_predict": 250,    # Enough for complex queries
-                "top_p": 0.9,
-                "repeat_penalty": 1.1, # Prevent hallucination loops
-            },
-        )
-        ai_text = response["message"]["content"]
-
-        # Pass through guardrail responses unchanged
-        if ai_text.strip().startswith(("CLARIFICATION_NEEDED:", "SCHEMA_ANSWER:")):
-            return ai_text.strip()
-
-        # Extract and return clean SQL
-        return extract_sql(ai_text) or ai_text.strip()
-
-    except ollama.ResponseError as exc:
+    head, _, question = messages[-1]["content"].rpartition("\n\n")
+    scope = hashlib.sha256(_dumps([config.MODEL_NAME, messages[:-1], head])).hexdigest()
+    return scope, question
+
+
+# SQL handed to the caller but not yet accepted or rejected: sql → cache ctx.
+# Nothing reaches the caches until the caller has validated and run it.
+_PENDING: dict[str, tuple] = {}
+_PENDING_MAX = 32
+
+
+def _remember_pending(sql: str, ctx: tuple):
+    with _CACHE_LOCK:
+        _PENDING.pop(sql, None)
+        _PENDING[sql] = ctx
+        while len(_PENDING) > _PENDING_MAX:
+            del _PENDING[next(iter(_PENDING))]
+
+
+def _take_pending(sql: str) -> tuple | None:
+    with _CACHE_LOCK:
+        return _PENDING.pop(sql, None)
+
+
+def _cached_sql(messages: list) -> tuple[str | None, tuple]:
+    """
+    Looks the request up in the exact and semantic caches.
+    Returns (cached_sql, ctx) – ctx is passed to _finish_sql on a miss.
+    """
+    key = _exact_key(messages, SQL_OPTIONS)
+    scope, question = _cache_parts(messages)
+    cached, vector = _exact_get(key), None
+    if cached is None:
+        cached, vector = _SEMANTIC_CACHE.lookup(scope, question)
+    ctx = (key, scope, question, vector)
+    if cached is not None:
+        # A replay can still fail (e.g. the data changed) – let reject_sql evict it
+        _remember_pending(cached, ctx)
+    return cached, ctx
+
+
+_GUARDRAIL_PREFIXES = ("CLARIFICATION_NEEDED:", "SCHEMA_ANSWER:")
+
+
+def _finish_sql(ai_text: str, ctx: tuple) -> str:
+    """
+    Turns raw model output into clean SQL. Extracted SQL is held until the
+    caller reports back through accept_sql / reject_sql; text without SQL
+    is returned as-is and never cached.
+    """
+    # Pass through guardrail responses unchanged – only the head needs checking
+    if ai_text[:64].lstrip().startswith(_GUARDRAIL_PREFIXES):
+        return ai_text.strip()
+
+    sql = extract_sql(ai_text)
+    if sql is None:
+        return ai_text.strip()
+    _remember_pending(sql, ctx)
+    return sql
+
+
+def accept_sql(sql: str):
+    """Caches SQL from mindsql_start once it has passed validation and run."""
+    ctx = _take_pending(sql)
+    if ctx is None:
+        return
+    key, scope, question, vector = ctx
+    _exact_put(key, sql)
+    _SEMANTIC_CACHE.store(scope, question, vector, sql)
+
+
+def reject_sql(sql: str):
+    """Forgets SQL from mindsql_start that failed validation or execution."""
+    ctx = _take_pending(sql)
+    if ctx is None:
+        return
+    key, scope = ctx[0], ctx[1]
+    _exact_discard(key)
+    _SEMANTIC_CACHE.discard(scope, sql)
+
+
+def _ollama_error(exc: Exception) -> str:
+    if isinstance(exc, ollama.ResponseError):
         if "model" in str(exc).lower():
             return (
                 f"CLARIFICATION_NEEDED: Model '{config.MODEL_NAME}' not found. "
                 "Run the installer or: ollama create mindsql-v2 -f Modelfile"
             )
         return f"CLARIFICATION_NEEDED: Ollama error – {exc}"
+    return f"CLARIFICATION_NEEDED: AI connection error – {exc}"
+
+
+def mindsql_start(messages: list) -> str:
+    """
+    Sends messages to Ollama in strict/SQL mode.
+    Returns clean SQL or a CLARIFICATION_NEEDED string.
+    Identical and semantically equivalent questions are answered from cache.
+    """
+    try:
+        cached, ctx = _cached_sql(messages)
+        if cached is not None:
+            return cached
+        response = _accumulate_streaming_response(_CLIENT.chat(
+            model=config.MODEL_NAME,
+            messages=messages,
+            keep_alive=config.OLLAMA_KEEP_ALIVE,
+            stream=True,
+            options=SQL_OPTIONS,
+        ))
+        return _finish_sql(response["message"]["content"], ctx)
     except Exception as exc:
-        return f"CLARIFICATION_NEEDED: AI connection error – {exc}"
+        return _ollama_error(exc)
+
+
+def warm_up(interval: float | None = None):
+    """
+    Loads the model in the background so the first question doesn't pay
+    Ollama's cold-start. With an interval, it re-loads periodically, which
+    also recovers from an Ollama restart that dropped the model.
+    """
+    def load():
+        try:
+            # An empty message list loads the model without generating
+            _CLIENT.chat(
+                model=config.MODEL_NAME,
+                messages=[],
+                keep_alive=config.OLLAMA_KEEP_ALIVE,
+                options={"num_ctx": config.NUM_CTX},
+            )
+        except Exception:
+            pass  # Real calls surface Ollama errors to the user
+        if interval:
+            timer = threading.Timer(interval, load)
+            timer.daemon = True
+            timer.start()
+
+    threading.Thread(target=load, daemon=True).start()
 
 
 def chat_with_model(messages: list) -> dict:
@@ -50,16 +278,21 @@ def chat_with_model(messages: list) -> dict:
     Full conversational mode – returns the raw Ollama response dict.
     Used by mindsql_ans and mindsql_export.
     """
+    key = _exact_key(messages, CHAT_OPTIONS)
+    cached = _exact_get(key)
+    if cached is not None:
+        return {"message": {"content": cached}}
+
     try:
-        return ollama.chat(
+        response = _accumulate_streaming_response(_CLIENT.chat(
             model=config.MODEL_NAME,
             messages=messages,
-            options={
-                "temperature": 0.5,    # Slightly more creative for explanations
-                "num_predict": 512,
-                "repeat_penalty": 1.1,
-            },
-        )
+            keep_alive=config.OLLAMA_KEEP_ALIVE,
+            stream=True,
+            options=CHAT_OPTIONS,
+        ))
+        _exact_put(key, response["message"]["content"])
+        return response
     except Exception as exc:
         # Return a dict that mimics Ollama's structure so callers don't crash
         return {"message": {"content": f"CLARIFICATION_NEEDED: {exc}"}}
@@ -70,21 +303,41 @@ def stream_chat(messages: list, on_token=None):
     Streaming version – calls on_token(str) for each token received.
     Returns the full assembled response string.
     """
-    full = ""
+    parts: list[str] = []
+
+    def collect(token: str):
+        parts.append(token)
+        if on_token:
+            on_token(token)
+
     try:
-        for chunk in ollama.chat(
+        _accumulate_streaming_response(_CLIENT.chat(
             model=config.MODEL_NAME,
             messages=messages,
+            keep_alive=config.OLLAMA_KEEP_ALIVE,
             stream=True,
-            options={"temperature": 0.5, "num_predict": 512},
-        ):
-            token = chunk["message"]["content"]
-            full += token
-            if on_token:
-                on_token(token)
+            options={"temperature": 0.5, "num_predict": 512, "num_ctx": config.NUM_CTX},
+        ), collect)
     except Exception as exc:
-        err = f"\n[Error: {exc}]"
-        full += err
+        collect(f"\n[Error: {exc}]")
+    return "".join(parts)
+
+
+def _accumulate_streaming_response(chunks, on_token=None) -> dict:
+    """
+    Drains a stream=True chat generator into one response dict shaped like
+    a non-streaming reply. Streaming avoids Ollama's occasional long stall
+    on non-streamed responses. Token counts from the final chunk are kept.
+    """
+    parts: list[str] = []
+    response = {"message": {"role": "assistant", "content": ""}}
+    for chunk in chunks:
+        token = chunk["message"]["content"]
+        parts.append(token)
         if on_token:
-            on_token(err)
-    return full
+            on_token(token)
+        if chunk["done"]:
+            for field in ("prompt_eval_count", "eval_count", "total_duration"):
+                response[field] = chunk[field]
+    response["message"]["content"] = "".join(parts)
+    return response
@@ -38,8 +38,18 @@ APP_FILES = [
     "validator.py",
     "sql_completer.py",
     "schema_manager.py",
+    "semantic_cache.py",
 ]
 
+# Heavy packages that may be installed in the build env but are never
+# imported at runtime – keeping PyInstaller from pulling them in shrinks
+# both executables and cuts analysis time.
+EXCLUDES = ["PyQt5", "PyQt6", "matplotlib", "pandas", "numpy.tests", "IPython", "pytest"]
+
+
+def _exclude_args(*extra: str) -> list[str]:
+    return [arg for mod in (*EXCLUDES, *extra) for arg in ("--exclude-module", mod)]
+
 
 def clean():
     print("🧹 Cleaning previous build…")
@@ -70,8 +80,9 @@ def build_main_app():
         "--hidden-import", "prompt_toolkit",
         "--hidden-import", "rich",
         "--hidden-import", "ollama",
-        "--collect-all", "customtkinter",
         "--collect-all", "sql_metadata",
+        # The terminal app has no GUI; only the installer needs Tk
+        *_exclude_args("tkinter", "customtkinter"),
         # Embed all app modules so no source is needed at runtime
         "--add-data", "config.py:.",
         "--add-data", "ai_engine.py:.",
@@ -80,6 +91,7 @@ def build_main_app():
         "--add-data", "validator.py:.",
         "--add-data", "sql_completer.py:.",
         "--add-data", "schema_manager.py:.",
+        "--add-data", "semantic_cache.py:.",
         "main.py",
     ]
     subprocess.run(cmd, check=True)
@@ -114,6 +126,7 @@ def build_installer():
         "--windowed",                      # No console window for installer
         "--hidden-import", "winreg",
         "--collect-all", "customtkinter",
+        *_exclude_args(),
         *add_data_args,
         "installer.py",
     ]
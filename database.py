@@ -5,6 +5,17 @@ Supports MySQL, PostgreSQL, SQLite, and MSSQL.
 """
 
 import os
+import json
+import socket
+import hashlib
+import sqlglot
+from decimal import Decimal, InvalidOperation
+from contextlib import contextmanager
+from sqlglot import exp
+from sqlglot.tokens import TokenType
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from sqlalchemy import create_engine, inspect, text, event
 from sqlalchemy.engine.url import make_url
 from rich.table import Table
@@ -17,8 +28,16 @@ from ui import console
 
 # ── File helpers ───────────────────────────────────────────────────────────────
 def load_file(filename: str) -> str | None:
-    if not os.path.exists(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
         return None
+    # Keyed on mtime/size, so an unchanged file is served from memory
+    return _read_text(filename, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=16)
+def _read_text(filename: str, mtime_ns: int, size: int) -> str | None:
     with open(filename, "r", encoding="utf-8") as f:
         return f.read().strip() or None
 
@@ -29,29 +48,260 @@ def save_file(filename: str, content: str):
 
 
 # ── Schema extraction ──────────────────────────────────────────────────────────
-def load_schema_map(engine) -> dict:
+_SCHEMA_CACHE_VERSION = "3"
+
+_MYSQL_COLUMNS_SQL = """
+SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE
+FROM information_schema.COLUMNS c
+JOIN information_schema.TABLES t
+  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+_MYSQL_KEYS_SQL = """
+SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME,
+       REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+FROM information_schema.KEY_COLUMN_USAGE
+WHERE TABLE_SCHEMA = DATABASE()
+  AND (CONSTRAINT_NAME = 'PRIMARY' OR REFERENCED_TABLE_NAME IS NOT NULL)
+ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+"""
+
+_PG_COLUMNS_SQL = """
+SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod)
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema()
+  AND c.relkind IN ('r', 'p')
+  AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY c.relname, a.attnum
+"""
+
+_PG_KEYS_SQL = """
+SELECT c.relname, con.contype,
+       ARRAY(SELECT a.attname
+             FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_catalog.pg_attribute a
+               ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+             ORDER BY k.ord),
+       rc.relname,
+       ARRAY(SELECT a.attname
+             FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_catalog.pg_attribute a
+               ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+             ORDER BY k.ord)
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_class rc ON rc.oid = con.confrelid
+WHERE n.nspname = current_schema() AND con.contype IN ('p', 'f')
+ORDER BY c.relname, con.conname
+"""
+
+# One-row catalog digests: any column, type or key change alters them, so a
+# matching digest proves the cached schema is still exact.
+_MYSQL_FINGERPRINT_SQL = """
+SELECT COUNT(*),
+       COALESCE(SUM(CRC32(CONCAT_WS('.', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLUMN_KEY))), 0),
+       (SELECT COUNT(*) FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL)
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+_PG_FINGERPRINT_SQL = """
+SELECT COUNT(*),
+       md5(COALESCE(string_agg(
+           c.relname || '.' || a.attname || ' ' || format_type(a.atttypid, a.atttypmod),
+           ',' ORDER BY c.relname, a.attnum), '')),
+       (SELECT md5(COALESCE(string_agg(con.conname || con.contype, ',' ORDER BY con.conname), ''))
+        FROM pg_catalog.pg_constraint con
+        JOIN pg_catalog.pg_namespace cn ON cn.oid = con.connamespace
+        WHERE cn.nspname = current_schema() AND con.contype IN ('p', 'f'))
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema()
+  AND c.relkind IN ('r', 'p')
+  AND a.attnum > 0 AND NOT a.attisdropped
+"""
+
+_FINGERPRINT_SQL = {"mysql": _MYSQL_FINGERPRINT_SQL, "postgresql": _PG_FINGERPRINT_SQL}
+
+
+def _schema_fingerprint(engine) -> str | None:
+    """Digest of the live catalog in one query, or None where unsupported."""
+    query = _FINGERPRINT_SQL.get(engine.dialect.name)
+    if query is None:
+        return None
+    with engine.connect() as conn:
+        return repr(tuple(conn.execute(text(query)).one()))
+
+
+def reflect_schema(engine, table_names: list | None = None, refresh: bool = False) -> dict:
+    """
+    Returns {table: {columns: [[name, type], …], primary_keys, foreign_keys}}.
+    Served from the on-disk cache when the database's schema fingerprint is
+    unchanged; refresh=True forces a full re-introspection.
+    """
+    # MySQL/PostgreSQL: a catalog digest also catches column changes made
+    # outside MindSQL; elsewhere the table list is the best cheap signal
+    fingerprint = _schema_fingerprint(engine)
+    if fingerprint is None:
+        if table_names is None:
+            table_names = inspect(engine).get_table_names()
+        fingerprint = str(sorted(table_names))
+    url = engine.url.render_as_string(hide_password=True)
+    signature = hashlib.sha256(
+        (_SCHEMA_CACHE_VERSION + url + fingerprint).encode("utf-8")
+    ).hexdigest()
+
+    cache = _read_schema_cache()
+    entry = cache.get(url)
+    if not refresh and entry and entry.get("signature") == signature:
+        return entry["schema"]
+
+    schema = _reflect_uncached(engine, table_names)
+
+    cache[url] = {"signature": signature, "schema": schema}
+    try:
+        save_file(config.SCHEMA_CACHE_FILE, json.dumps(cache))
+    except OSError:
+        pass  # Cache is an optimisation only
+    return schema
+
+
+def load_schema_map(engine, table_names: list | None = None, refresh: bool = False) -> dict:
     """Builds the in-memory schema dict {table: {columns, foreign_keys}}."""
+    return _to_schema_map(reflect_schema(engine, table_names, refresh))
+
+
+def _to_schema_map(schema: dict) -> dict:
+    return {
+        table: {
+            "columns": [name for name, _ in info["columns"]],
+            "foreign_keys": info["foreign_keys"],
+        }
+        for table, info in schema.items()
+    }
+
+
+def schema_column_map(schema: dict) -> dict[str, list[str]]:
+    """The config.SCHEMA_MAP shape: {table: [column names]}."""
+    return {table: [name for name, _ in info["columns"]] for table, info in schema.items()}
+
+
+def _reflect_uncached(engine, table_names: list | None) -> dict:
+    """
+    Catalog queries fetch every table in two round-trips on MySQL/PostgreSQL;
+    other dialects (SQLite is local anyway) fall back to the inspector.
+    """
+    dialect = engine.dialect.name
+    if dialect not in ("mysql", "postgresql"):
+        return _reflect_with_inspector(engine, table_names)
+
+    with engine.connect() as conn:
+        if dialect == "mysql":
+            column_rows = conn.execute(text(_MYSQL_COLUMNS_SQL)).all()
+            constraints = _group_mysql_keys(conn.execute(text(_MYSQL_KEYS_SQL)).all())
+        else:
+            column_rows = conn.execute(text(_PG_COLUMNS_SQL)).all()
+            constraints = conn.execute(text(_PG_KEYS_SQL)).all()
+
+    # The catalog queries already select base tables of the current schema
+    wanted = None if table_names is None else set(table_names)
     schema = {}
-    inspector = inspect(engine)
-    for table in inspector.get_table_names():
-        columns = [c["name"] for c in inspector.get_columns(table)]
-        foreign_keys = [
-            {
-                "child_columns": fk["constrained_columns"],
-                "parent_table": fk["referred_table"],
-                "parent_columns": fk["referred_columns"],
+    for table, rows in groupby(column_rows, key=itemgetter(0)):
+        if wanted is None or table in wanted:
+            schema[table] = {
+                "columns": [[name, str(col_type).upper()] for _, name, col_type in rows],
+                "primary_keys": [],
+                "foreign_keys": [],
             }
-            for fk in inspector.get_foreign_keys(table)
-        ]
-        schema[table] = {"columns": columns, "foreign_keys": foreign_keys}
+    for table, kind, columns, parent_table, parent_columns in constraints:
+        info = schema.get(table)
+        if info is None:
+            continue
+        if kind == "p":
+            info["primary_keys"] = list(columns)
+        else:
+            info["foreign_keys"].append({
+                "child_columns": list(columns),
+                "parent_table": parent_table,
+                "parent_columns": list(parent_columns),
+            })
+    return schema
+
+
+def _group_mysql_keys(rows):
+    """Folds per-column KEY_COLUMN_USAGE rows into one row per constraint."""
+    for (table, name), group in groupby(rows, key=itemgetter(0, 1)):
+        group = list(group)
+        columns = [r[2] for r in group]
+        if name == "PRIMARY":
+            yield table, "p", columns, None, []
+        else:
+            yield table, "f", columns, group[0][3], [r[4] for r in group]
+
+
+def _reflect_with_inspector(engine, table_names: list) -> dict:
+    inspector = inspect(engine)
+    try:
+        # SQLAlchemy 2.0 batches reflection for the whole schema;
+        # keys are (schema, table) with schema None for the default one
+        all_columns = inspector.get_multi_columns()
+        all_pks = inspector.get_multi_pk_constraint()
+        all_fks = inspector.get_multi_foreign_keys()
+    except AttributeError:
+        # Older SQLAlchemy – one round-trip per table and kind
+        all_columns = {(None, t): inspector.get_columns(t) for t in table_names}
+        all_pks = {(None, t): inspector.get_pk_constraint(t) for t in table_names}
+        all_fks = {(None, t): inspector.get_foreign_keys(t) for t in table_names}
+
+    schema = {}
+    for table in table_names:
+        key = (None, table)
+        schema[table] = {
+            "columns": [[c["name"], str(c["type"])] for c in all_columns.get(key, [])],
+            "primary_keys": (all_pks.get(key) or {}).get("constrained_columns", []),
+            "foreign_keys": [
+                {
+                    "child_columns": fk["constrained_columns"],
+                    "parent_table": fk["referred_table"],
+                    "parent_columns": fk["referred_columns"],
+                }
+                for fk in all_fks.get(key, [])
+            ],
+        }
     return schema
 
 
+def clear_schema_cache():
+    """Drops the cached schema, e.g. after DDL changed the structure."""
+    try:
+        os.remove(config.SCHEMA_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def _read_schema_cache() -> dict:
+    try:
+        return json.loads(load_file(config.SCHEMA_CACHE_FILE) or "{}")
+    except ValueError:
+        return {}
+
+
 # ── Connection ─────────────────────────────────────────────────────────────────
-def perform_connection(connection_string: str):
+def perform_connection(connection_string: str, refresh_schema: bool = False,
+                       reachable: bool = False):
     """
     Connects to any SQLAlchemy-supported database,
     saves the URL, and returns (engine, table_names).
+    refresh_schema=True bypasses the cached schema map.
+    reachable=True skips the TCP preflight when the caller has just talked
+    to the same server.
     """
     dialect = connection_string.split("://")[0] if "://" in connection_string else "unknown"
     label = _dialect_label(dialect)
@@ -60,22 +310,24 @@ def perform_connection(connection_string: str):
         f"[bold blue]🔌 Connecting to {label}…[/bold blue]", spinner="dots"
     ):
         try:
+            if not reachable:
+                _preflight(connection_string)
             engine = create_engine(
                 connection_string,
-                pool_pre_ping=True,        # Detect stale connections
-                pool_recycle=3600,         # Recycle after 1 hour
                 connect_args=_connect_args(dialect),
+                **_pool_args(dialect),
             )
-            inspector = inspect(engine)
-            table_names = inspector.get_table_names()
+            # The introspection below doubles as the one-shot liveness check
+            table_names = inspect(engine).get_table_names()
+            schema = reflect_schema(engine, table_names, refresh=refresh_schema)
 
             if not table_names:
                 console.print("[yellow]⚠ Connected, but database is empty.[/yellow]")
             else:
-                _write_schema_file(engine, inspector, table_names)
+                write_schema_file(schema)
 
             save_file(config.DB_URL_FILE, connection_string)
-            config.SCHEMA_MAP = load_schema_map(engine)
+            config.SCHEMA_MAP = schema_column_map(schema)
 
             console.print(
                 Panel(
@@ -110,6 +362,40 @@ def _dialect_label(dialect: str) -> str:
     }.get(dialect, dialect)
 
 
+_DEFAULT_PORTS = {"mysql": 3306, "postgresql": 5432, "mssql": 1433}
+
+
+def _preflight(connection_string: str):
+    """
+    TCP reachability check before driver auth, so a dead host fails in
+    2 s instead of the full connect_timeout. File-based URLs are skipped.
+    """
+    url = make_url(connection_string)
+    port = url.port or _DEFAULT_PORTS.get(url.get_backend_name())
+    if not url.host or port is None:
+        return
+    try:
+        socket.create_connection((url.host, port), timeout=2).close()
+    except OSError as exc:
+        raise ConnectionError(f"Cannot reach {url.host}:{port} ({exc})") from exc
+
+
+def _pool_args(dialect: str) -> dict:
+    """
+    Pool sizing for server databases. No per-checkout pre-ping – stale
+    connections are handled by pool_recycle instead of a SELECT 1 per query.
+    """
+    if "sqlite" in dialect:
+        return {}   # SQLite picks its own pool class; sizing args don't apply
+    return {
+        "pool_size":     16,
+        "max_overflow":  16,
+        "pool_pre_ping": False,
+        "pool_use_lifo": True,    # Reuse the warmest connection first
+        "pool_recycle":  3600,    # Recycle after 1 hour
+    }
+
+
 def _connect_args(dialect: str) -> dict:
     """Dialect-specific connection arguments."""
     if "mysql" in dialect:
@@ -121,27 +407,61 @@ def _connect_args(dialect: str) -> dict:
     return {}
 
 
-def _write_schema_file(engine, inspector, table_names: list):
-    """Writes a human-readable CREATE TABLE schema to disk for AI context."""
-    with open(config.SCHEMA_FILE, "w", encoding="utf-8") as f:
-        for table in table_names:
-            cols = inspector.get_columns(table)
-            f.write(f"CREATE TABLE {table} (\n")
-            col_defs = [f"    {c['name']} {c['type']}" for c in cols]
-            f.write(",\n".join(col_defs))
-            f.write("\n);\n")
-            pks = inspector.get_pk_constraint(table).get("constrained_columns", [])
-            if pks:
-                f.write(f"-- Primary Keys: {', '.join(pks)}\n")
-            for fk in inspector.get_foreign_keys(table):
-                f.write(
-                    f"-- Foreign Key: ({', '.join(fk['constrained_columns'])}) "
-                    f"→ {fk['referred_table']}({', '.join(fk['referred_columns'])})\n"
-                )
-            f.write("\n")
+def write_schema_file(schema: dict) -> str:
+    """
+    Writes a human-readable CREATE TABLE schema to disk for AI context
+    and returns the text.
+    """
+    parts: list[str] = []
+    for table, info in schema.items():
+        parts.append(
+            f"CREATE TABLE {table} (\n"
+            + ",\n".join(f"    {name} {col_type}" for name, col_type in info["columns"])
+            + "\n);\n"
+        )
+        pks = info["primary_keys"]
+        if pks:
+            parts.append(f"-- Primary Keys: {', '.join(pks)}\n")
+        parts.extend(
+            f"-- Foreign Key: ({', '.join(fk['child_columns'])}) "
+            f"→ {fk['parent_table']}({', '.join(fk['parent_columns'])})\n"
+            for fk in info["foreign_keys"]
+        )
+        parts.append("\n")
+    schema_text = "".join(parts)
+    buf = schema_text.encode("utf-8")
+    if not _same_contents(config.SCHEMA_FILE, buf):
+        _write_bytes(config.SCHEMA_FILE, buf)
+    return schema_text
+
+
+def _same_contents(path: str, buf: bytes) -> bool:
+    """Size check first, full compare only when sizes match."""
+    try:
+        if os.stat(path).st_size != len(buf):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == buf
+    except OSError:
+        return False
+
+
+def _write_bytes(path: str, buf: bytes):
+    """Unbuffered write of a prebuilt buffer straight to the file descriptor."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(fd, view):]   # os.write may write partially
+    finally:
+        os.close(fd)
 
 
 # ── SQL Execution ──────────────────────────────────────────────────────────────
+# Retries and repeated queries re-run identical SQL; reuse the TextClause
+_TEXT = lru_cache(maxsize=512)(text)
+
+
 def execute_sql(engine, sql: str, raise_error: bool = False, return_data: bool = False):
     """
     Executes one or more SQL statements safely.
@@ -151,22 +471,28 @@ def execute_sql(engine, sql: str, raise_error: bool = False, return_data: bool =
     last_data: list[tuple] = []
 
     try:
-        commands = [c.strip() for c in sql.split(";") if c.strip()]
+        commands = _split_statements(sql, engine.dialect.name)
+        statements = _coalesce_inserts(commands, engine.dialect.name)
 
         with engine.connect() as conn:
             trans = conn.begin()
             try:
-                for cmd in commands:
+                for cmd in statements:
+                    if isinstance(cmd, tuple):
+                        # Coalesced INSERT run – one executemany, nothing returned
+                        template, params = cmd
+                        conn.execute(_TEXT(template), params)
+                        continue
                     if cmd.upper() in ("BEGIN", "COMMIT", "ROLLBACK"):
                         continue
-                    result = conn.execute(text(cmd))
+                    result = conn.execute(_TEXT(cmd), execution_options=_stream_options(cmd))
 
                     if result.returns_rows:
-                        rows = result.fetchall()
-                        last_data = [tuple(r) for r in rows]
-
-                        if not return_data:
-                            _print_result_table(result, rows)
+                        if return_data:
+                            last_data = list(map(tuple, capped_rows(result)))
+                        else:
+                            _print_result_table(result)
+                        result.close()   # Release the server-side cursor early
 
                 trans.commit()
             except Exception as exc:
@@ -193,15 +519,222 @@ def execute_sql(engine, sql: str, raise_error: bool = False, return_data: bool =
         return []
 
 
-def _print_result_table(result, rows: list):
-    """Renders query results as a rich Table."""
-    if not rows:
-        console.print("[dim]Query returned no rows.[/dim]")
+@contextmanager
+def stream_rows(engine, sql: str):
+    """
+    Runs a single read and yields its Result – a one-pass row iterator over
+    a server-side cursor, so the caller never holds the full result as a
+    list. Yields () for a statement without rows; SQL errors are reported
+    like execute_sql and yield None.
+    """
+    conn = None
+    try:
+        conn = engine.connect()
+        result = conn.execute(_TEXT(sql), execution_options=_stream_options(sql))
+    except Exception as exc:
+        if conn is not None:
+            conn.close()
+        console.print(Panel(f"[bold red]SQL Error[/bold red]\n{exc}", style="red"))
+        yield None
         return
+    try:
+        yield result if result.returns_rows else ()
+    finally:
+        result.close()
+        conn.close()
+
+
+_SQLGLOT_DIALECTS = {"mysql": "mysql", "postgresql": "postgres", "sqlite": "sqlite", "mssql": "tsql"}
+_INSERT_BATCH = 500   # Max rows sent in one executemany
+
+
+def warm_connection(engine):
+    """
+    Checks a pooled connection out and pings it, so the pool is warm by the
+    time the generated SQL is ready to run. Meant for a background thread.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(_TEXT("SELECT 1"))
+    except Exception:
+        pass  # Opportunistic – execute_sql reports real connection errors
+
+
+def _split_statements(sql: str, dialect: str) -> list[str]:
+    """
+    Splits a script on top-level semicolons using sqlglot's tokenizer, so a
+    ';' inside a string literal or quoted identifier doesn't cut a statement.
+    Slices the original text, leaving each statement exactly as written.
+    """
+    try:
+        tokens = sqlglot.Dialect.get_or_raise(_SQLGLOT_DIALECTS.get(dialect)).tokenize(sql)
+    except sqlglot.errors.TokenError:
+        return [c.strip() for c in sql.split(";") if c.strip()]
+
+    parts, start = [], 0
+    for tok in tokens:
+        if tok.token_type == TokenType.SEMICOLON:
+            parts.append(sql[start:tok.start])
+            start = tok.end + 1
+    parts.append(sql[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _coalesce_inserts(commands: list[str], dialect: str) -> list:
+    """
+    Groups runs of consecutive INSERT … VALUES statements with the same target
+    into one executemany over bound parameters, so an N-row seed script is one
+    driver call instead of N. The statement text up to VALUES is kept exactly
+    as written; only plain literal values become parameters. Returns strings
+    (run as-is) and (template, params) pairs.
+    """
+    if sum(cmd[:6].upper() == "INSERT" for cmd in commands) < 2:
+        return commands
+
+    read = _SQLGLOT_DIALECTS.get(dialect)
+    merged: list = []
+    run: list[tuple[str, list[tuple]]] = []
+    run_key = None
+    run_rows = 0
+
+    def flush():
+        if len(run) == 1:
+            merged.append(run[0][0])
+        elif run:
+            head, width = run_key
+            names = [f"p{i}" for i in range(width)]
+            template = f"{head}VALUES ({', '.join(':' + n for n in names)})"
+            params = [dict(zip(names, row)) for _, rows in run for row in rows]
+            merged.append((template, params))
+        run.clear()
+
+    for cmd in commands:
+        head, rows = _insert_rows(cmd, read)
+        key = None if head is None else (head, len(rows[0]))
+        if key is None or key != run_key or run_rows >= _INSERT_BATCH:
+            flush()
+            run_rows = 0
+        if key is None:
+            merged.append(cmd)
+        else:
+            run.append((cmd, rows))
+            run_rows += len(rows)
+        run_key = key
+    flush()
+    return merged
+
+
+_NOT_LITERAL = object()
+
+
+def _literal_value(node):
+    """Python value of a plain SQL literal, or _NOT_LITERAL for anything else."""
+    if isinstance(node, exp.Null):
+        return None
+    if isinstance(node, exp.Boolean):
+        return node.this
+    negate = isinstance(node, exp.Neg)
+    if negate:
+        node = node.this
+    if not isinstance(node, exp.Literal) or (negate and node.is_string):
+        return _NOT_LITERAL
+    if node.is_string:
+        return node.this
+    try:
+        value = int(node.this)
+    except ValueError:
+        try:
+            value = Decimal(node.this)
+        except InvalidOperation:
+            return _NOT_LITERAL
+    return -value if negate else value
+
+
+def _insert_rows(cmd: str, read: str | None):
+    """
+    (verbatim text before VALUES, [row tuples]) for a plain INSERT … VALUES
+    of literals, else (None, None). Backslashes are left alone entirely, as
+    their escaping rules differ between dialects and server modes.
+    """
+    if cmd[:6].upper() != "INSERT" or "\\" in cmd:
+        return None, None
+    try:
+        tree = sqlglot.parse_one(cmd, read=read)
+        tokens = sqlglot.Dialect.get_or_raise(read).tokenize(cmd)
+    except sqlglot.errors.SqlglotError:
+        return None, None
+    if not isinstance(tree, exp.Insert) or not isinstance(tree.expression, exp.Values):
+        return None, None
+    # RETURNING, ON CONFLICT / DUPLICATE KEY, etc. change per-row semantics
+    if any(v for k, v in tree.args.items() if k not in ("this", "expression")):
+        return None, None
+    values_at = next((t.start for t in tokens if t.token_type == TokenType.VALUES), None)
+    if values_at is None:
+        return None, None
+
+    rows = []
+    for row in tree.expression.expressions:
+        values = tuple(_literal_value(v) for v in row.expressions)
+        if _NOT_LITERAL in values:
+            return None, None
+        # sqlite3 cannot bind Decimal; a float would lose the literal's precision
+        if read == "sqlite" and any(isinstance(v, Decimal) for v in values):
+            return None, None
+        rows.append(values)
+    if not rows or len({len(r) for r in rows}) != 1:
+        return None, None
+    # Escape ':' so text() doesn't read the verbatim head as bind parameters
+    return cmd[:values_at].replace(":", "\\:"), rows
+
+
+def _stream_options(cmd: str) -> dict:
+    """
+    Server-side cursors for reads only – PostgreSQL cannot DECLARE a named
+    cursor over INSERT/UPDATE/DDL.
+    """
+    head = cmd.lstrip()[:6].upper()
+    if head.startswith(("SELECT", "WITH")):
+        return {"stream_results": True, "yield_per": config.FETCH_SIZE}
+    return {}
+
+
+def capped_rows(rows):
+    """Yields at most MAX_RETURN_ROWS rows, warning when the rest are cut off."""
+    for n, row in enumerate(rows):
+        if n == config.MAX_RETURN_ROWS:
+            console.print(
+                f"[yellow]⚠ Result truncated to the first {config.MAX_RETURN_ROWS:,} rows.[/yellow]"
+            )
+            return
+        yield row
+
+
+_NULL_CELL = "[dim]NULL[/dim]"
+
+
+def _print_result_table(result):
+    """Renders query results as a rich Table, streaming at most MAX_DISPLAY_ROWS rows."""
     tbl = Table(box=box.ROUNDED, border_style="dim", show_lines=False)
     for key in result.keys():
         tbl.add_column(str(key), style="cyan", no_wrap=False)
-    for row in rows:
-        tbl.add_row(*[str(v) if v is not None else "[dim]NULL[/dim]" for v in row])
+
+    add_row = tbl.add_row
+    shown, truncated = 0, False
+    for partition in result.partitions(config.FETCH_SIZE):
+        for row in partition:
+            if shown == config.MAX_DISPLAY_ROWS:
+                truncated = True
+                break
+            add_row(*[_NULL_CELL if v is None else str(v) for v in row])
+            shown += 1
+        if truncated:
+            break
+
+    if not shown:
+        console.print("[dim]Query returned no rows.[/dim]")
+        return
     console.print(tbl)
-    console.print(f"[dim]{len(rows)} row(s)[/dim]")
+    if truncated:
+        console.print(f"[dim]Showing first {shown} row(s) – more rows not displayed.[/dim]")
+    else:
+        console.print(f"[dim]{shown} row(s)[/dim]")
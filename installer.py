@@ -12,31 +12,31 @@ Every long-running step has a live loading screen:
 """
 
 import os
+import re
 import sys
+import json
+import errno
+import hashlib
 import subprocess
 import platform
 import threading
-import urllib.request
 import shutil
 import time
-import zipfile
-import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import customtkinter as ctk
-from tkinter import font as tkfont
 
 # ── OS DETECTION ──────────────────────────────────────────────────────────────
 _OS = platform.system()   # "Windows" | "Linux" | "Darwin"
 
-if _OS == "Windows":
-    import winreg
-    import ctypes as _ctypes
-
 # ── CONSTANTS ─────────────────────────────────────────────────────────────────
 APP_NAME      = "MindSQL"
 APP_VERSION   = "1.0.0"
 MODEL_NAME    = "mindsql-v2"
+EMBED_MODEL   = "mxbai-embed-large"   # semantic cache embeddings (config.EMBED_MODEL)
 GGUF_FILENAME = "qwen2.5-coder-3b-instruct.Q4_K_M.gguf"
 
 # ⚠️  IMPORTANT: This URL must point to your PUBLIC HuggingFace repo.
@@ -54,6 +54,10 @@ OLLAMA_URLS = {
     "Darwin":  "https://ollama.com/download/Ollama-darwin.zip",  # macOS app bundle
 }
 
+OLLAMA_API = "http://127.0.0.1:11434"   # local daemon, probed before spawning the CLI
+OLLAMA_CACHE_TTL = 7 * 24 * 3600   # Reuse a downloaded Ollama package for a week
+DOWNLOAD_CHUNK = 1024 * 1024   # 1 MiB reads keep syscall + UI-update counts low
+
 # Install location per OS
 if _OS == "Windows":
     INSTALL_DIR = Path(os.environ.get("LOCALAPPDATA", Path.home())) / "MindSQL"
@@ -64,6 +68,12 @@ else:
 
 MODEL_DIR = INSTALL_DIR / "models"
 
+# System-check results are cached so reopening the installer doesn't
+# re-spawn the Ollama probes; entries older than the TTL are ignored.
+PROBE_CACHE     = Path.home() / ".mindsql" / "cache" / "requirements.json"
+PROBE_CACHE_TTL = 24 * 3600
+MODEL_CACHE     = PROBE_CACHE.parent / "model.json"   # what the model was last built from
+
 MODELFILE_TEMPLATE = """\
 FROM {model_path}
 SYSTEM "You are an expert SQL assistant. Generate only correct SQL."
@@ -72,10 +82,151 @@ PARAMETER num_predict 250
 PARAMETER repeat_penalty 1.1
 """
 
-# ── THEME ─────────────────────────────────────────────────────────────────────
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme("dark-blue")
+def _sha256_file(path: Path):
+    """Returns a sha256 object fed with path's contents."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):          # Python 3.11+: hashed in C
+            return hashlib.file_digest(f, "sha256")
+        digest = hashlib.sha256()
+        buf = memoryview(bytearray(DOWNLOAD_CHUNK))  # reused – no per-chunk allocation
+        while n := f.readinto(buf):
+            digest.update(buf[:n])
+        return digest
+
+
+def _stat(path):
+    """One os.stat instead of exists() + stat(); None when the file is absent."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def _tls_context():
+    """One TLS context per run – the CA bundle is loaded once, not per connection."""
+    import ssl
+    return ssl.create_default_context()
+
+
+def _opener(*handlers):
+    """urllib opener sharing _tls_context() across downloads and redirect hops."""
+    import urllib.request
+    return urllib.request.build_opener(
+        urllib.request.HTTPSHandler(context=_tls_context()), *handlers)
+
+
+def _expected_gguf_sha256():
+    """
+    HuggingFace answers a resolve URL for an LFS file with a redirect whose
+    X-Linked-Etag header is the file's SHA-256. Returns it, or None.
+    """
+    import urllib.error
+    import urllib.request
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    try:
+        req = urllib.request.Request(HF_MODEL_URL, method="HEAD")
+        with _opener(_NoRedirect).open(req, timeout=15) as r:
+            headers = r.headers
+    except urllib.error.HTTPError as exc:
+        headers = exc.headers                       # the 302 itself
+    except OSError:
+        return None
+    etag = (headers.get("X-Linked-Etag") or "").strip('"')
+    return etag.lower() if len(etag) == 64 else None
+
+
+def _missing_packages(pkgs):
+    """
+    Filters a pip requirement list down to what is absent or below its
+    ">=" floor, via in-process metadata lookups instead of pip round-trips.
+    A frozen installer's own metadata says nothing about the target
+    interpreter, so there every package is passed through to pip.
+    """
+    if getattr(sys, "frozen", False):
+        return pkgs
+    from importlib.metadata import version, PackageNotFoundError
+
+    def as_tuple(v):
+        return tuple(int(p) for p in re.findall(r"\d+", v)[:3])
+
+    missing = []
+    for spec in pkgs:
+        name, _, floor = spec.partition(">=")
+        try:
+            if floor and as_tuple(version(name)) < as_tuple(floor):
+                missing.append(spec)
+        except PackageNotFoundError:
+            missing.append(spec)
+    return missing
+
+
+def _read_cached_probe():
+    """Returns the cached {"ollama": version|None, "model": bool}, or None if stale."""
+    try:
+        data = json.loads(PROBE_CACHE.read_text(encoding="utf-8"))
+        if time.time() - data["ts"] < PROBE_CACHE_TTL:
+            return data["probes"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _write_cached_probe(probes):
+    try:
+        PROBE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        PROBE_CACHE.write_text(json.dumps({"ts": time.time(), "probes": probes}),
+                               encoding="utf-8")
+    except OSError:
+        pass    # cache is best-effort
+
+
+def _model_stamp(gguf_path: Path, modelfile: str):
+    """Identifies a model build: the GGUF file's identity plus the Modelfile text."""
+    st = gguf_path.stat()
+    return {
+        "model": MODEL_NAME,
+        "gguf": [str(gguf_path), st.st_size, st.st_mtime_ns],
+        "modelfile": hashlib.sha256(modelfile.encode("utf-8")).hexdigest(),
+    }
+
 
+def _read_model_stamp():
+    try:
+        return json.loads(MODEL_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_model_stamp(stamp):
+    try:
+        MODEL_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        MODEL_CACHE.write_text(json.dumps(stamp), encoding="utf-8")
+    except OSError:
+        pass    # cache is best-effort
+
+
+def _add_local_bin_to_rc(*names):
+    """
+    Appends the ~/.local/bin PATH export to each existing shell rc file
+    that lacks it – one read per file, and an append instead of a rewrite.
+    """
+    for rc in names:
+        rc_path = Path.home() / rc
+        try:
+            content = rc_path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue    # missing or unreadable – leave it alone
+        if ".local/bin" not in content:
+            with rc_path.open("a", encoding="utf-8") as f:
+                f.write('\nexport PATH="$HOME/.local/bin:$PATH"\n')
+
+
+# ── THEME ─────────────────────────────────────────────────────────────────────
 C = {
     "bg":      "#0D1117",
     "surface": "#161B22",
@@ -90,6 +241,21 @@ C = {
 
 
 # ── WIDGETS ───────────────────────────────────────────────────────────────────
+_FONTS = {}
+
+def _font(size, weight="normal", family=None):
+    """
+    One shared CTkFont per (size, weight, family) – each CTkFont registers
+    a Tk font, and every StepRow would otherwise create three of its own.
+    Only call once the Tk root exists.
+    """
+    key = (size, weight, family)
+    if key not in _FONTS:
+        kw = {"family": family} if family else {}
+        _FONTS[key] = ctk.CTkFont(size=size, weight=weight, **kw)
+    return _FONTS[key]
+
+
 class StepRow(ctk.CTkFrame):
     ICONS = {
         "pending": ("⏳", C["dim"]),
@@ -102,15 +268,15 @@ class StepRow(ctk.CTkFrame):
     def __init__(self, parent, label, **kw):
         super().__init__(parent, fg_color="transparent", **kw)
         self._icon = ctk.CTkLabel(self, text="⏳", width=30,
-                                   font=ctk.CTkFont(size=16))
+                                   font=_font(16))
         self._icon.pack(side="left", padx=(0, 8))
         self._text = ctk.CTkLabel(self, text=label, anchor="w",
                                    text_color=C["dim"],
-                                   font=ctk.CTkFont(size=13))
+                                   font=_font(13))
         self._text.pack(side="left", fill="x", expand=True)
         self._note = ctk.CTkLabel(self, text="", anchor="e",
                                    text_color=C["dim"],
-                                   font=ctk.CTkFont(size=11))
+                                   font=_font(11))
         self._note.pack(side="right", padx=8)
 
     def set_state(self, state, note=""):
@@ -124,15 +290,34 @@ class LogBox(ctk.CTkTextbox):
     """Scrolling log viewer shown during ollama create."""
     def __init__(self, parent, **kw):
         kw.setdefault("height", 80)
-        kw.setdefault("font", ctk.CTkFont(family="Courier", size=10))
+        kw.setdefault("font", _font(10, family="Courier"))
         kw.setdefault("fg_color", "#0a0f14")
         kw.setdefault("text_color", C["dim"])
         kw.setdefault("state", "disabled")
         super().__init__(parent, **kw)
+        self._pending: list[str] = []
+        self._flush_scheduled = False
+
+    MAX_LINES  = 500   # older output is trimmed so redraws stay cheap
+    TRIM_LINES = 200
 
     def append(self, line: str):
+        # Chatty subprocesses emit many lines per frame – insert them in
+        # one batch every 50 ms rather than one widget update per line
+        self._pending.append(line)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after(50, self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
         self.configure(state="normal")
-        self.insert("end", line + "\n")
+        self.insert("end", "\n".join(self._pending) + "\n")
+        self._pending.clear()
+        if int(self.index("end-1c").split(".")[0]) > self.MAX_LINES:
+            self.delete("1.0", f"{self.TRIM_LINES + 1}.0")
         self.see("end")
         self.configure(state="disabled")
 
@@ -142,32 +327,56 @@ class MindSQLInstaller(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.title(f"{APP_NAME}  Setup  v{APP_VERSION}")
+        self.resizable(False, False)   # before geometry – avoids a resize-hint renegotiation
         self.geometry("600x820")
-        self.resizable(False, False)
         self.configure(fg_color=C["bg"])
         self._preflight = {}
+        self._probes_fresh = threading.Event()
         self._model_path = None
+        self._gguf_sha256 = None   # digest computed while downloading
+        self._dl_state = {}        # key → latest (done_mb, total_mb, pct)
+        self._dl_pending = set()   # keys with a flush already scheduled
+        self._ui_q = deque()       # (fn, args, kwargs) posted by worker threads
         self._build_ui()
+        self.after(16, self._drain_ui)
         # Auto-run system check when window opens
         threading.Thread(target=self._run_preflight, daemon=True).start()
 
     # ── BUILD UI ──────────────────────────────────────────────────────────────
+    def _build_dl_panel(self):
+        outer = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
+        title = ctk.CTkLabel(outer, text="",
+                             font=_font(11, "bold"),
+                             text_color=C["warning"])
+        title.pack(anchor="w", padx=12, pady=(8, 2))
+        bar = ctk.CTkProgressBar(outer, height=10,
+                                 progress_color=C["warning"],
+                                 fg_color=C["border"])
+        bar.pack(fill="x", padx=12, pady=(2, 4))
+        bar.set(0)
+        info = ctk.CTkLabel(outer, text="Waiting…",
+                            font=_font(11),
+                            text_color=C["dim"])
+        info.pack(anchor="w", padx=12, pady=(0, 8))
+        # hidden until a download starts
+        return {"outer": outer, "title": title, "bar": bar, "info": info}
+
     def _build_ui(self):
         # Header
         hdr = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=0)
         hdr.pack(fill="x")
         ctk.CTkLabel(hdr, text="🧠  MindSQL",
-                     font=ctk.CTkFont(size=30, weight="bold"),
+                     font=_font(30, "bold"),
                      text_color=C["text"]).pack(pady=(20, 2))
         ctk.CTkLabel(hdr,
                      text=f"AI-Powered Database Terminal  •  One-Click Setup  •  {_OS}",
-                     font=ctk.CTkFont(size=11), text_color=C["dim"]).pack(pady=(0, 16))
+                     font=_font(11), text_color=C["dim"]).pack(pady=(0, 16))
 
         # System check panel
         pf = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
         pf.pack(fill="x", padx=20, pady=(12, 0))
         ctk.CTkLabel(pf, text="System Check  (runs automatically)",
-                     font=ctk.CTkFont(size=10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(8, 2))
+                     font=_font(10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(8, 2))
         self._pf_rows = {}
         for key, label in {
             "python": "Python environment",
@@ -184,15 +393,15 @@ class MindSQLInstaller(ctk.CTk):
         loc = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
         loc.pack(fill="x", padx=20, pady=(8, 0))
         ctk.CTkLabel(loc, text="Install Location",
-                     font=ctk.CTkFont(size=10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(6, 0))
+                     font=_font(10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(6, 0))
         ctk.CTkLabel(loc, text=str(INSTALL_DIR),
-                     font=ctk.CTkFont(size=10), text_color=C["text"]).pack(anchor="w", padx=12, pady=(0, 6))
+                     font=_font(10), text_color=C["text"]).pack(anchor="w", padx=12, pady=(0, 6))
 
         # Installation steps
         sp = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
         sp.pack(fill="x", padx=20, pady=8)
         ctk.CTkLabel(sp, text="Installation Steps",
-                     font=ctk.CTkFont(size=10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(8, 4))
+                     font=_font(10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(8, 4))
         self._steps = []
         for lbl in [
             "Prepare install directory",
@@ -208,29 +417,14 @@ class MindSQLInstaller(ctk.CTk):
             self._steps.append(r)
         ctk.CTkLabel(sp, text="", height=4).pack()
 
-        # ── Live download progress (shown during downloads) ────────────────
-        self._dl_outer = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
-        self._dl_outer.pack(fill="x", padx=20, pady=(0, 4))
-        self._dl_title = ctk.CTkLabel(self._dl_outer, text="",
-                                       font=ctk.CTkFont(size=11, weight="bold"),
-                                       text_color=C["warning"])
-        self._dl_title.pack(anchor="w", padx=12, pady=(8, 2))
-        self._dl_bar = ctk.CTkProgressBar(self._dl_outer, height=10,
-                                           progress_color=C["warning"],
-                                           fg_color=C["border"])
-        self._dl_bar.pack(fill="x", padx=12, pady=(2, 4))
-        self._dl_bar.set(0)
-        self._dl_info = ctk.CTkLabel(self._dl_outer, text="Waiting…",
-                                      font=ctk.CTkFont(size=11),
-                                      text_color=C["dim"])
-        self._dl_info.pack(anchor="w", padx=12, pady=(0, 8))
-        self._dl_outer.pack_forget()  # hidden until a download starts
+        # ── Live download progress (one panel per concurrent download) ────
+        self._dl = {key: self._build_dl_panel() for key in ("ollama", "gguf")}
 
         # ── Log box shown during 'ollama create' ──────────────────────────
         self._log_outer = ctk.CTkFrame(self, fg_color=C["surface"], corner_radius=8)
         self._log_outer.pack(fill="x", padx=20, pady=(0, 4))
         ctk.CTkLabel(self._log_outer, text="Ollama model build output",
-                     font=ctk.CTkFont(size=10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(6, 2))
+                     font=_font(10), text_color=C["dim"]).pack(anchor="w", padx=12, pady=(6, 2))
         self._log_box = LogBox(self._log_outer)
         self._log_box.pack(fill="x", padx=12, pady=(0, 8))
         self._log_outer.pack_forget()  # hidden until build starts
@@ -245,7 +439,7 @@ class MindSQLInstaller(ctk.CTk):
         self._prog_bar.set(0)
         self._status_lbl = ctk.CTkLabel(pg, text="Running system check…",
                                          text_color=C["dim"],
-                                         font=ctk.CTkFont(size=11))
+                                         font=_font(11))
         self._status_lbl.pack(anchor="w")
 
         # Buttons
@@ -253,21 +447,33 @@ class MindSQLInstaller(ctk.CTk):
         bf.pack(fill="x", padx=20, pady=10)
         self._install_btn = ctk.CTkButton(
             bf, text="⚡  Install MindSQL",
-            font=ctk.CTkFont(size=15, weight="bold"),
+            font=_font(15, "bold"),
             height=48, corner_radius=8,
             fg_color=C["accent"], hover_color="#1D4ED8",
             command=self._start_install, state="disabled")
         self._install_btn.pack(fill="x")
         self._launch_btn = ctk.CTkButton(
             bf, text="🚀  Launch MindSQL",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=_font(14, "bold"),
             height=44, corner_radius=8,
             fg_color=C["success"], hover_color="#16A34A",
             command=self._launch_app, state="disabled")
         self._launch_btn.pack(fill="x", pady=(8, 0))
 
     # ── THREAD-SAFE HELPERS ───────────────────────────────────────────────────
-    def _ui(self, fn, *a, **kw):    self.after(0, fn, *a, **kw)
+    def _ui(self, fn, *a, **kw):    self._ui_q.append((fn, a, kw))
+
+    def _drain_ui(self):
+        # Worker threads only append to the deque; the Tk thread applies
+        # everything queued in one pass per ~60 Hz frame
+        q = self._ui_q
+        try:
+            for _ in range(len(q)):
+                fn, a, kw = q.popleft()
+                fn(*a, **kw)
+        finally:
+            self.after(16, self._drain_ui)   # a failing callback must not stop the UI
+
     def _set_status(self, msg, color=None):
         self._ui(self._status_lbl.configure, text=msg, text_color=color or C["dim"])
     def _set_prog(self, v):         self._ui(self._prog_bar.set, v)
@@ -275,20 +481,32 @@ class MindSQLInstaller(ctk.CTk):
     def _pf(self, k, s, note=""):   self._ui(self._pf_rows[k].set_state, s, note)
 
     # ── SHOW / HIDE DOWNLOAD PANEL ────────────────────────────────────────────
-    def _show_dl(self, title="Downloading…"):
-        self._ui(self._dl_title.configure, text=title)
-        self._ui(self._dl_bar.set, 0)
-        self._ui(self._dl_info.configure, text="Starting…")
-        self._ui(self._dl_outer.pack, fill="x", padx=20, pady=(0, 4))
-
-    def _hide_dl(self):
-        self._ui(self._dl_outer.pack_forget)
-
-    def _update_dl(self, done_mb, total_mb, pct):
-        self._ui(self._dl_bar.set, pct)
-        self._ui(self._dl_info.configure,
-                 text=f"{done_mb:.1f} MB / {total_mb:.1f} MB  —  {int(pct*100)}%  "
-                      f"({'downloading…' if pct < 1 else 'complete!'})")
+    def _show_dl(self, key, title="Downloading…"):
+        panel = self._dl[key]
+        self._ui(panel["title"].configure, text=title)
+        self._ui(panel["bar"].set, 0)
+        self._ui(panel["info"].configure, text="Starting…")
+        self._ui(panel["outer"].pack, fill="x", padx=20, pady=(0, 4))
+
+    def _hide_dl(self, key):
+        self._ui(self._dl[key]["outer"].pack_forget)
+
+    def _update_dl(self, key, done_mb, total_mb, pct):
+        # Worker threads only record the latest numbers; one queued flush
+        # per key applies them, however many ticks arrived in between
+        self._dl_state[key] = (done_mb, total_mb, pct)
+        if key not in self._dl_pending:
+            self._dl_pending.add(key)
+            self._ui(self._flush_dl, key)
+
+    def _flush_dl(self, key):
+        self._dl_pending.discard(key)
+        done_mb, total_mb, pct = self._dl_state[key]
+        panel = self._dl[key]
+        panel["bar"].set(pct)
+        panel["info"].configure(
+            text=f"{done_mb:.1f} MB / {total_mb:.1f} MB  —  {int(pct*100)}%  "
+                 f"({'downloading…' if pct < 1 else 'complete!'})")
 
     # ── SHOW / HIDE LOG BOX ───────────────────────────────────────────────────
     def _show_log(self):
@@ -307,39 +525,64 @@ class MindSQLInstaller(ctk.CTk):
         self._preflight["python"] = True
         self._pf("python", "done", f"v{sys.version.split()[0]}")
 
-        # Ollama
+        # Ollama + model: served from the probe cache when fresh, then
+        # re-checked in the background (stale-while-revalidate)
         self._pf("ollama", "running")
-        ok = self._is_ollama_installed()
-        self._preflight["ollama"] = ok
-        if ok:
-            v = self._ollama_version()
-            self._pf("ollama", "done", f"{v}  already installed")
-        else:
-            self._pf("ollama", "pending", f"will be installed for {_OS}")
-
-        # Ollama model
         self._pf("model", "running")
-        ok = self._is_model_installed()
-        self._preflight["model"] = ok
-        self._pf("model", "done" if ok else "pending",
-                 "already in Ollama" if ok else "will be created")
+        cached = _read_cached_probe()
+        if cached is not None:
+            self._apply_probes(cached)
+            threading.Thread(target=self._revalidate_probes, daemon=True).start()
+        else:
+            self._revalidate_probes()
 
         # GGUF file
         self._pf("gguf", "running")
-        gguf = MODEL_DIR / GGUF_FILENAME
-        ok = gguf.exists() and gguf.stat().st_size > 100_000_000   # >100 MB = real file
+        size = self._gguf_size()
+        ok = size > 100_000_000   # >100 MB = real file
         self._preflight["gguf"] = ok
         if ok:
-            self._pf("gguf", "done",
-                     f"on disk  ({gguf.stat().st_size/1_073_741_824:.1f} GB)")
+            self._pf("gguf", "done", f"on disk  ({size/1_073_741_824:.1f} GB)")
         else:
-            self._pf("gguf", "pending", "will be downloaded (~2 GB)")
+            part = _stat((MODEL_DIR / GGUF_FILENAME).with_suffix(".gguf.part"))
+            if part is not None:
+                self._pf("gguf", "pending",
+                         f"partial download – resumes at {part.st_size/1_073_741_824:.1f} GB")
+            else:
+                self._pf("gguf", "pending", "will be downloaded (~2 GB)")
 
         self._ui(self._apply_skip_marks)
         self._set_status("Ready — click Install to begin.")
         self._ui(self._install_btn.configure, state="normal")
 
+    def _revalidate_probes(self):
+        """Spawns the Ollama probes side by side and refreshes the cache."""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            version_f = pool.submit(self._ollama_version)
+            model_f   = pool.submit(self._is_model_installed)
+            probes = {"ollama": version_f.result(), "model": model_f.result()}
+        _write_cached_probe(probes)
+        self._apply_probes(probes)
+        self._ui(self._apply_skip_marks)
+        self._probes_fresh.set()
+
+    def _apply_probes(self, probes):
+        version = probes["ollama"]
+        self._preflight["ollama"] = version is not None
+        if version is not None:
+            self._pf("ollama", "done", f"{version}  already installed")
+        else:
+            self._pf("ollama", "pending", f"will be installed for {_OS}")
+
+        ok = probes["model"]
+        self._preflight["model"] = ok
+        self._pf("model", "done" if ok else "pending",
+                 "already in Ollama" if ok else "will be created")
+
     def _apply_skip_marks(self):
+        # Reset first – a background re-check may have overturned a cached skip
+        for i in (2, 3, 4):
+            self._steps[i].set_state("pending")
         if self._preflight.get("ollama"):
             self._steps[2].set_state("skip", "already installed")
         if self._preflight.get("gguf"):
@@ -349,31 +592,43 @@ class MindSQLInstaller(ctk.CTk):
             self._steps[4].set_state("skip", "already exists")
 
     # ── DETECT HELPERS ────────────────────────────────────────────────────────
-    def _is_ollama_installed(self):
-        try:
-            subprocess.run(["ollama", "--version"],
-                           capture_output=True, check=True, timeout=10)
-            return True
-        except Exception:
-            return False
-
     def _ollama_version(self):
+        """Returns the installed Ollama version, or None if Ollama isn't installed."""
+        # A running daemon answers in ~1 ms – far cheaper than spawning the CLI
+        import urllib.request
+        try:
+            with urllib.request.urlopen(f"{OLLAMA_API}/api/version", timeout=1) as r:
+                return json.load(r).get("version", "")
+        except (OSError, ValueError):
+            pass    # daemon not running – the binary may still be installed
+        if shutil.which("ollama") is None:
+            return None   # in-process PATH scan: no binary, no point spawning
         try:
             r = subprocess.run(["ollama", "--version"],
-                               capture_output=True, text=True, timeout=10)
-            return r.stdout.strip().split()[-1]
+                               capture_output=True, text=True, check=True, timeout=10)
+            return r.stdout.strip().split()[-1] if r.stdout.strip() else ""
         except Exception:
-            return ""
+            return None
 
-    def _is_model_installed(self):
+    def _gguf_size(self):
+        st = _stat(MODEL_DIR / GGUF_FILENAME)
+        return st.st_size if st else 0
+
+    def _is_model_installed(self, name=MODEL_NAME):
+        # Same daemon-first approach as _ollama_version: /api/tags is the
+        # JSON behind `ollama list`
+        import urllib.request
         try:
-            r = subprocess.run(["ollama", "list"],
-                               capture_output=True, text=True, timeout=15)
-            for line in r.stdout.strip().splitlines()[1:]:
-                parts = line.split()
-                if parts and parts[0].split(":")[0] == MODEL_NAME:
-                    return True
-            return False
+            with urllib.request.urlopen(f"{OLLAMA_API}/api/tags", timeout=1) as r:
+                models = json.load(r).get("models", [])
+            return any(m.get("name", "").split(":")[0] == name for m in models)
+        except (OSError, ValueError):
+            pass    # daemon not running – ask the CLI
+        try:
+            # Targeted lookup: exits 0 only if this one model exists
+            r = subprocess.run(["ollama", "show", name],
+                               capture_output=True, timeout=10)
+            return r.returncode == 0
         except Exception:
             return False
 
@@ -383,8 +638,12 @@ class MindSQLInstaller(ctk.CTk):
         threading.Thread(target=self._run_install, daemon=True).start()
 
     def _run_install(self):
+        pip_job = None
         try:
             T = 7
+            # Never act on a cached probe that the background check may overturn
+            self._probes_fresh.wait()
+            PROBE_CACHE.unlink(missing_ok=True)   # Install is about to change what was probed
 
             # 0 — Prepare directory ────────────────────────────────────────────
             self._step(0, "running")
@@ -396,58 +655,78 @@ class MindSQLInstaller(ctk.CTk):
                    if getattr(sys, "frozen", False)
                    else Path(__file__).parent)
             app_files = ["main.py","ai_engine.py","config.py","database.py",
-                         "ui.py","validator.py","sql_completer.py","schema_manager.py"]
-            copied = sum(1 for f in app_files
-                         if (src/f).exists() and shutil.copy2(src/f, INSTALL_DIR/f) or True
-                         if (src/f).exists())
+                         "ui.py","validator.py","sql_completer.py","schema_manager.py",
+                         "semantic_cache.py"]
+            copied = 0
+            for f in app_files:
+                try:
+                    shutil.copyfile(src / f, INSTALL_DIR / f)   # sendfile/fcopyfile fast path
+                    copied += 1
+                except FileNotFoundError:
+                    pass    # not bundled in this build
             self._step(0, "done", f"{copied} files")
             self._set_prog(1/T)
 
             # 1 — Python packages ──────────────────────────────────────────────
+            # pip is independent of the Ollama / model steps, so it runs in the
+            # background while they download and build; joined before step 5.
             self._step(1, "running")
-            self._set_status("Installing Python packages…")
-            self._install_packages()
-            self._step(1, "done")
-            self._set_prog(2/T)
-
-            # 2 — Ollama ───────────────────────────────────────────────────────
-            self._step(2, "running")
-            if self._preflight.get("ollama"):
-                self._step(2, "skip", "already installed")
-            else:
-                self._install_ollama()   # has its own loading screen
-                self._step(2, "done")
-            self._set_prog(3/T)
+            pip_pool = ThreadPoolExecutor(max_workers=1)
+            pip_job = pip_pool.submit(self._install_packages)
+            pip_pool.shutdown(wait=False)
 
-            # 3 — Download GGUF ────────────────────────────────────────────────
+            # 2 + 3 — Ollama and GGUF download, side by side ────────────────
+            # Independent network I/O to different files: the Ollama install
+            # overlaps the much longer model download.
             gguf = MODEL_DIR / GGUF_FILENAME
-
-            if self._preflight.get("model"):
-                self._step(3, "skip", "model already in Ollama")
-                self._step(4, "skip", "already exists")
-                self._set_prog(5/T)
-
-            elif self._preflight.get("gguf") and gguf.exists():
-                self._step(3, "skip", "already on disk")
-                self._set_prog(4/T)
-                self._step(4, "running")
-                self._build_model(gguf)        # has its own log box
-                self._step(4, "done")
-                self._set_prog(5/T)
-
-            else:
-                self._step(3, "running")
-                self._download_gguf(gguf)      # live progress bar
-                self._step(3, "done")
-                self._set_prog(4/T)
-
+            jobs = {}
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                if self._preflight.get("ollama"):
+                    self._step(2, "skip", "already installed")
+                else:
+                    self._step(2, "running")
+                    jobs[2] = pool.submit(self._install_ollama)   # has its own loading screen
+
+                if self._preflight.get("model"):
+                    self._step(3, "skip", "model already in Ollama")
+                    self._step(4, "skip", "already exists")
+                elif self._preflight.get("gguf") and gguf.exists():
+                    self._step(3, "skip", "already on disk")
+                else:
+                    self._step(3, "running")
+                    jobs[3] = pool.submit(self._download_gguf, gguf)   # live progress bar
+
+                # Wait for both before reporting, so a failure never leaves
+                # the other download writing in the background
+                errors = []
+                for i, job in jobs.items():
+                    try:
+                        job.result()
+                        self._step(i, "done")
+                    except Exception as exc:
+                        self._step(i, "error")
+                        errors.append(exc)
+                if errors:
+                    raise errors[0]
+            self._set_prog(4/T)
+
+            # 4 — Register model ───────────────────────────────────────────────
+            if not self._preflight.get("model"):
                 self._step(4, "running")
+                self._verify_gguf(gguf)
                 self._build_model(gguf)        # live log box
                 self._step(4, "done")
-                self._set_prog(5/T)
+            self._pull_embed_model()
+            self._set_prog(5/T)
 
             self._model_path = gguf
 
+            if not pip_job.done():
+                self._set_status("Finishing Python packages…")
+            pip_job.result()
+            self._step(1, "done")
+            self._set_prog(5.5/T)
+
             # 5 — Register command ─────────────────────────────────────────────
             self._step(5, "running")
             self._set_status("Registering 'mindsql' command…")
@@ -471,6 +750,16 @@ class MindSQLInstaller(ctk.CTk):
 
         except Exception as exc:
             import traceback; traceback.print_exc()
+            # Settle the background pip before Retry is offered, so a second
+            # run never installs into the same site-packages alongside it
+            if pip_job is not None:
+                if not pip_job.done():
+                    self._set_status("Stopping – waiting for Python packages to finish…")
+                try:
+                    pip_job.result()
+                    self._step(1, "done")
+                except Exception:
+                    self._step(1, "error")
             self._set_status(f"❌  {exc}", C["error"])
             self._ui(self._install_btn.configure,
                      state="normal", text="⚡  Retry")
@@ -479,21 +768,35 @@ class MindSQLInstaller(ctk.CTk):
     def _install_packages(self):
         pkgs = ["ollama", "sqlalchemy>=2.0", "pymysql", "psycopg2-binary",
                 "rich", "prompt_toolkit", "typer", "sqlglot",
-                "sql-metadata", "customtkinter"]
+                "sql-metadata", "orjson", "customtkinter"]
+
+        pkgs = _missing_packages(pkgs)
+        if not pkgs:
+            self._step(1, "running", "already installed")
+            return
 
         # On system-managed Pythons (Debian/Ubuntu 23.10+) we need this flag
         extra = ["--break-system-packages"] if _OS == "Linux" else []
 
-        for pkg in pkgs:
-            self._set_status(f"Installing  {pkg}…")
-            try:
-                subprocess.run(
-                    [sys.executable, "-m", "pip", "install",
-                     "--quiet", "--upgrade", pkg] + extra,
-                    check=True, capture_output=True, timeout=120
-                )
-            except subprocess.CalledProcessError:
-                pass    # non-fatal: package may already be current
+        # One pip run resolves everything together and reuses its HTTP pool,
+        # instead of paying interpreter + resolver + index startup per package
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "pip", "install", "--upgrade",
+             "--no-input", "--disable-pip-version-check", *pkgs, *extra],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        # The log box and status line belong to the foreground steps running
+        # alongside; pip's progress goes to its own step row instead
+        for line in proc.stdout:
+            if line.startswith(("Collecting ", "Requirement already satisfied: ")):
+                name = line.split(maxsplit=1)[1].split(":")[-1].split()[0]
+                self._step(1, "running", name)
+            elif line.startswith("Installing collected packages"):
+                self._step(1, "running", "installing…")
+        proc.wait()
+        if proc.returncode != 0:
+            # non-fatal, as before: packages may already be current
+            self._step(1, "running", f"pip exited {proc.returncode}")
 
 
     # ── OLLAMA DOWNLOAD + INSTALL ─────────────────────────────────────────────
@@ -509,16 +812,42 @@ class MindSQLInstaller(ctk.CTk):
                 f"Unsupported OS '{_OS}'. Please install Ollama manually: https://ollama.com"
             )
 
+    def _fetch_ollama_package(self, url: str, dest: Path, os_label: str):
+        """
+        Downloads the Ollama installer package unless a recent complete copy
+        is already on disk (downloads only land at dest once finished, so an
+        existing file is never partial). Re-runs after a failed step then
+        skip the multi-hundred-MB download.
+        """
+        st = _stat(dest)
+        if st and time.time() - st.st_mtime < OLLAMA_CACHE_TTL:
+            self._set_status(f"Using previously downloaded Ollama for {os_label}…")
+            return
+        self._show_dl("ollama", f"Downloading Ollama for {os_label}…")
+        self._set_status("Downloading Ollama installer…")
+        try:
+            self._download_with_retry(url, dest, "ollama")
+        finally:
+            self._hide_dl("ollama")
+
+    def _wait_for_ollama(self, timeout=60):
+        """Polls until Ollama answers, backing off from 0.25 s to 2 s."""
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while time.monotonic() < deadline:
+            if self._ollama_version() is not None:
+                return
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
+        raise RuntimeError(f"Ollama did not come up within {timeout}s.")
+
     def _install_ollama_windows(self):
         """Downloads OllamaSetup.exe with progress bar, then runs it silently."""
         dest = INSTALL_DIR / "OllamaSetup.exe"
-        self._show_dl("Downloading Ollama for Windows…")
-        self._set_status("Downloading Ollama installer…")
-        self._download_with_progress(OLLAMA_URLS["Windows"], dest)
-        self._hide_dl()
+        self._fetch_ollama_package(OLLAMA_URLS["Windows"], dest, "Windows")
         self._set_status("Running Ollama installer silently…")
         subprocess.run([str(dest), "/S"], check=True, timeout=300)
-        time.sleep(8)   # wait for Ollama to finish registering
+        self._wait_for_ollama()   # installer returns before Ollama finishes registering
 
     def _install_ollama_linux(self):
         """
@@ -528,24 +857,29 @@ class MindSQLInstaller(ctk.CTk):
         self._show_log()
         self._set_status("Installing Ollama for Linux (requires internet)…")
         self._log("► Downloading and running Ollama install script…")
-        self._log("  Source: https://ollama.com/install.sh")
+        self._log(f"  Source: {OLLAMA_URLS['Linux']}")
         self._log("")
 
-        # Run curl | sh and stream output
+        # Fetch the script ourselves (with retry/resume) and pipe it to sh –
+        # no shell=True and no curl process
+        script = INSTALL_DIR / "ollama_install.sh"
         try:
-            proc = subprocess.Popen(
-                "curl -fsSL https://ollama.com/install.sh | sh",
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-            )
+            self._download_with_retry(OLLAMA_URLS["Linux"], script, "ollama")
+            with open(script, "rb") as stdin:
+                proc = subprocess.Popen(
+                    ["sh", "-s"],
+                    stdin=stdin,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
             for line in proc.stdout:
                 self._log(line.rstrip())
             proc.wait(timeout=300)
             if proc.returncode != 0:
                 raise RuntimeError("Ollama install script failed.")
         finally:
+            script.unlink(missing_ok=True)
             self._hide_log()
 
     def _install_ollama_macos(self):
@@ -576,36 +910,39 @@ class MindSQLInstaller(ctk.CTk):
 
         # Fallback: download the macOS .zip app bundle
         zip_dest = INSTALL_DIR / "Ollama-darwin.zip"
-        self._show_dl("Downloading Ollama for macOS…")
-        self._set_status("Downloading Ollama.app…")
-        self._download_with_progress(OLLAMA_URLS["Darwin"], zip_dest)
-        self._hide_dl()
+        self._fetch_ollama_package(OLLAMA_URLS["Darwin"], zip_dest, "macOS")
 
         self._set_status("Installing Ollama.app to /Applications…")
+        import zipfile   # only needed on the macOS fallback path
         with zipfile.ZipFile(zip_dest, "r") as z:
             z.extractall(INSTALL_DIR / "ollama_extracted")
 
-        app_src = INSTALL_DIR / "ollama_extracted" / "Ollama.app"
+        extracted = INSTALL_DIR / "ollama_extracted"
+        app_src = extracted / "Ollama.app"
         app_dst = Path("/Applications/Ollama.app")
         if app_dst.exists():
             shutil.rmtree(app_dst)
-        shutil.copytree(app_src, app_dst)
-        zip_dest.unlink(missing_ok=True)
+        try:
+            os.replace(app_src, app_dst)       # one rename instead of copying every file
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+            shutil.move(app_src, app_dst)      # different volume – copy + delete
+        shutil.rmtree(extracted, ignore_errors=True)
 
         # Launch the app once so it installs the CLI tool into /usr/local/bin
         subprocess.Popen(["open", "-a", "Ollama"])
-        time.sleep(6)
+        self._wait_for_ollama()
 
     # ── GGUF DOWNLOAD ─────────────────────────────────────────────────────────
     def _download_gguf(self, dest: Path):
         """Downloads the model from HuggingFace with a live progress bar."""
-        self._show_dl(f"Downloading AI Model from HuggingFace…")
+        self._show_dl("gguf", "Downloading AI Model from HuggingFace…")
         self._set_status("Downloading GGUF model (~2 GB)…")
-        self._log_box.append("") if hasattr(self, "_log_box") else None
         try:
-            self._download_with_progress(HF_MODEL_URL, dest)
+            self._gguf_sha256 = self._download_with_retry(HF_MODEL_URL, dest, "gguf")
         except Exception as exc:
-            dest.unlink(missing_ok=True)   # delete partial file
+            # Keep dest.part – the next attempt resumes from it
             raise RuntimeError(
                 f"Model download failed: {exc}\n\n"
                 "Make sure your HuggingFace repo is PUBLIC:\n"
@@ -613,21 +950,104 @@ class MindSQLInstaller(ctk.CTk):
                 "Settings → Repository visibility → Public"
             )
         finally:
-            self._hide_dl()
+            self._hide_dl("gguf")
 
-    def _download_with_progress(self, url: str, dest: Path):
-        """Generic download with live MB / % updates in the download panel."""
-        dest.parent.mkdir(parents=True, exist_ok=True)
+    def _verify_gguf(self, path: Path):
+        """
+        Checks the GGUF against HuggingFace's published SHA-256 before
+        'ollama create' spends minutes building from a corrupt file.
+        A mismatch is re-downloaded once before giving up.
+        """
+        expected = _expected_gguf_sha256()
+        if expected is None:
+            return   # offline / header missing – nothing to compare against
+        for attempt in range(2):
+            self._set_status("Verifying model file…")
+            actual = self._gguf_sha256 or _sha256_file(path).hexdigest()
+            if actual == expected:
+                return
+            path.unlink(missing_ok=True)
+            self._gguf_sha256 = None
+            if attempt == 0:
+                self._download_gguf(path)
+        raise RuntimeError(
+            "Downloaded model file is corrupt (SHA-256 mismatch). "
+            "It has been deleted – click Retry to download it again."
+        )
 
-        def hook(block_num, block_size, total_size):
-            if total_size > 0:
-                done  = block_num * block_size
-                pct   = min(done / total_size, 1.0)
-                self._update_dl(done / 1_048_576,
-                                total_size / 1_048_576,
-                                pct)
+    def _download_with_retry(self, url: str, dest: Path, key: str, max_attempts: int = 5):
+        """
+        Retries transient failures (connection resets, timeouts, HTTP 5xx)
+        with exponential backoff; each retry resumes from the .part file.
+        """
+        import http.client
+        import urllib.error
+
+        for attempt in range(max_attempts):
+            try:
+                return self._download_with_progress(url, dest, key)
+            except urllib.error.HTTPError as exc:
+                if exc.code < 500 or attempt == max_attempts - 1:
+                    raise
+                err = exc
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as exc:
+                if attempt == max_attempts - 1:
+                    raise
+                err = exc
+            delay = min(2 ** attempt, 30)
+            self._ui(self._dl[key]["info"].configure,
+                     text=f"Connection problem ({err}) – retrying in {delay}s…")
+            time.sleep(delay)
+
+    def _download_with_progress(self, url: str, dest: Path, key: str) -> str:
+        """
+        Streams url → dest in 1 MiB chunks with live MB / % updates and
+        returns the file's SHA-256, hashed in the same loop so the checksum
+        costs no extra pass over the file. Data lands in dest.part first; an
+        interrupted download resumes from the partial file's size via an
+        HTTP Range request.
+        """
+        import urllib.error
+        import urllib.request
 
-        urllib.request.urlretrieve(url, dest, reporthook=hook)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part = dest.with_name(dest.name + ".part")
+        st = _stat(part)
+        offset = st.st_size if st else 0
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            resp = _opener().open(urllib.request.Request(url, headers=headers), timeout=30)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 416 and offset:   # .part already holds the whole file
+                digest = _sha256_file(part)
+                os.replace(part, dest)
+                return digest.hexdigest()
+            raise
+
+        with resp:
+            if offset and resp.status != 206:
+                offset = 0                   # server ignored Range – start over
+            # A resumed download re-hashes what is already on disk first
+            digest = _sha256_file(part) if offset else hashlib.sha256()
+            total = offset + int(resp.headers.get("Content-Length") or 0)
+            done  = offset
+            shown_pct, shown_at = -1.0, 0.0
+            # Unbuffered: each 1 MiB chunk is already one write()
+            with open(part, "ab" if offset else "wb", buffering=0) as f:
+                while chunk := resp.read(DOWNLOAD_CHUNK):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    done += len(chunk)
+                    if not total:
+                        continue
+                    # Repaint only every 0.5 % or 250 ms, not once per chunk
+                    pct, now = min(done / total, 1.0), time.monotonic()
+                    if pct - shown_pct >= 0.005 or now - shown_at >= 0.25 or pct == 1.0:
+                        self._update_dl(key, done / 1_048_576, total / 1_048_576, pct)
+                        shown_pct, shown_at = pct, now
+        os.replace(part, dest)
+        return digest.hexdigest()
 
     # ── OLLAMA MODEL BUILD ────────────────────────────────────────────────────
     def _build_model(self, gguf_path: Path):
@@ -635,6 +1055,12 @@ class MindSQLInstaller(ctk.CTk):
         Runs 'ollama create' and streams every line of output into the log box
         so the UI is never frozen during the 1-2 minute build.
         """
+        modelfile = MODELFILE_TEMPLATE.format(model_path=str(gguf_path))
+        stamp = _model_stamp(gguf_path, modelfile)
+        if _read_model_stamp() == stamp and self._is_model_installed():
+            self._set_status("✅  Model already registered from this file.")
+            return
+
         self._show_log()
         self._set_status("Registering model in Ollama  (may take 1-2 minutes)…")
         self._log(f"► ollama create {MODEL_NAME}")
@@ -642,7 +1068,7 @@ class MindSQLInstaller(ctk.CTk):
         self._log("")
 
         mf = INSTALL_DIR / "Modelfile"
-        mf.write_text(MODELFILE_TEMPLATE.format(model_path=str(gguf_path)))
+        mf.write_bytes(modelfile.encode("utf-8"))   # Ollama reads UTF-8, not the locale codec
 
         try:
             proc = subprocess.Popen(
@@ -660,10 +1086,42 @@ class MindSQLInstaller(ctk.CTk):
                     "Check the log output above."
                 )
             self._log("\n✅  Model registered successfully.")
+            _write_model_stamp(stamp)
         finally:
             mf.unlink(missing_ok=True)
             self._hide_log()
 
+    def _pull_embed_model(self):
+        """
+        Pulls the embedding model behind the semantic cache. Best-effort: a
+        failed pull only leaves the cache off, so it never fails the install.
+        """
+        if self._is_model_installed(EMBED_MODEL):
+            return
+        self._show_log()
+        self._set_status(f"Pulling embedding model '{EMBED_MODEL}'…")
+        self._log(f"► ollama pull {EMBED_MODEL}")
+        try:
+            proc = subprocess.Popen(
+                ["ollama", "pull", EMBED_MODEL],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            for line in proc.stdout:
+                self._log(line.rstrip())
+            proc.wait(timeout=600)
+            if proc.returncode == 0:
+                self._log("\n✅  Embedding model ready.")
+            else:
+                self._log(f"\n⚠  Pull failed (exit {proc.returncode}) – the "
+                          f"semantic cache stays off until: ollama pull {EMBED_MODEL}")
+        except Exception as exc:
+            self._log(f"\n⚠  Pull failed ({exc}) – the semantic cache stays off "
+                      f"until: ollama pull {EMBED_MODEL}")
+        finally:
+            self._hide_log()
+
     # ── REGISTER COMMAND ──────────────────────────────────────────────────────
     def _register_command(self):
         if _OS == "Windows":
@@ -675,25 +1133,32 @@ class MindSQLInstaller(ctk.CTk):
 
     def _register_windows(self):
         """Creates mindsql.bat and adds INSTALL_DIR to user PATH via registry."""
+        import ctypes
+        import winreg   # Windows-only; imported here so other OSes never touch it
+
         bat = INSTALL_DIR / "mindsql.bat"
         bat.write_text(
             f'@echo off\n'
             f'"{sys.executable}" "{INSTALL_DIR / "main.py"}" shell %*\n'
         )
+
         # Registry PATH update
         try:
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER,
                                   "Environment", 0, winreg.KEY_ALL_ACCESS)
             try:    current, _ = winreg.QueryValueEx(key, "PATH")
             except FileNotFoundError: current = ""
-            dirs = [d for d in current.split(";") if d]
-            if str(INSTALL_DIR) not in dirs:
-                dirs.append(str(INSTALL_DIR))
+            # Windows paths are case-insensitive; append to the raw string so
+            # existing entries (and %VAR% markers) are kept byte-for-byte
+            target = str(INSTALL_DIR)
+            existing = {d.casefold() for d in current.split(";") if d}
+            if target.casefold() not in existing:
+                sep = ";" if current and not current.endswith(";") else ""
                 winreg.SetValueEx(key, "PATH", 0,
-                                   winreg.REG_EXPAND_SZ, ";".join(dirs))
+                                   winreg.REG_EXPAND_SZ, current + sep + target)
             winreg.CloseKey(key)
             # Broadcast change so open terminals pick it up
-            _ctypes.windll.user32.SendMessageTimeoutW(
+            ctypes.windll.user32.SendMessageTimeoutW(
                 0xFFFF, 0x001A, 0, "Environment", 0x0002, 5000, None)
         except Exception as e:
             print(f"[PATH] {e}")
@@ -705,39 +1170,24 @@ class MindSQLInstaller(ctk.CTk):
         Also adds ~/.local/bin to PATH in .bashrc and .zshrc if needed.
         """
         script = INSTALL_DIR / "mindsql"
-        script.write_text(
+        script.write_bytes((
             "#!/usr/bin/env bash\n"
             f'"{sys.executable}" "{INSTALL_DIR / "main.py"}" shell "$@"\n'
-        )
+        ).encode("utf-8"))
         script.chmod(0o755)
 
-        # Try system-wide first (needs sudo — will fail silently if no perms)
-        placed = False
-        for bin_dir in ("/usr/local/bin", "/usr/bin"):
-            try:
-                link = Path(bin_dir) / "mindsql"
-                if link.exists() or link.is_symlink(): link.unlink()
-                link.symlink_to(script)
-                placed = True
-                break
-            except PermissionError:
-                continue
-
-        # User-local fallback
-        if not placed:
-            local_bin = Path.home() / ".local" / "bin"
-            local_bin.mkdir(parents=True, exist_ok=True)
-            link = local_bin / "mindsql"
-            if link.exists() or link.is_symlink(): link.unlink()
-            link.symlink_to(script)
-            # Add to PATH in shell rc files if not already there
-            path_line = f'\nexport PATH="$HOME/.local/bin:$PATH"\n'
-            for rc in [".bashrc", ".zshrc", ".profile"]:
-                rc_path = Path.home() / rc
-                if rc_path.exists():
-                    content = rc_path.read_text()
-                    if ".local/bin" not in content:
-                        rc_path.write_text(content + path_line)
+        # System-wide if writable (needs sudo), else the user-local bin dir
+        local_bin = Path.home() / ".local" / "bin"
+        bin_dir = next((Path(d) for d in ("/usr/local/bin", "/usr/bin")
+                        if os.access(d, os.W_OK)), local_bin)
+        bin_dir.mkdir(parents=True, exist_ok=True)
+        link = bin_dir / "mindsql"
+        link.unlink(missing_ok=True)
+        link.symlink_to(script)
+
+        # User-local fallback needs ~/.local/bin on PATH
+        if bin_dir == local_bin:
+            _add_local_bin_to_rc(".bashrc", ".zshrc", ".profile")
 
     def _register_macos(self):
         """
@@ -745,37 +1195,24 @@ class MindSQLInstaller(ctk.CTk):
         Falls back to ~/.local/bin and updates .zshrc / .bash_profile.
         """
         script = INSTALL_DIR / "mindsql"
-        script.write_text(
+        script.write_bytes((
             "#!/usr/bin/env bash\n"
             f'"{sys.executable}" "{INSTALL_DIR / "main.py"}" shell "$@"\n'
-        )
+        ).encode("utf-8"))
         script.chmod(0o755)
 
         # macOS default shell is zsh; /usr/local/bin is usually writable
-        placed = False
-        for bin_dir in ("/usr/local/bin", "/opt/homebrew/bin"):
-            try:
-                link = Path(bin_dir) / "mindsql"
-                if link.exists() or link.is_symlink(): link.unlink()
-                link.symlink_to(script)
-                placed = True
-                break
-            except PermissionError:
-                continue
-
-        if not placed:
-            local_bin = Path.home() / ".local" / "bin"
-            local_bin.mkdir(parents=True, exist_ok=True)
-            link = local_bin / "mindsql"
-            if link.exists() or link.is_symlink(): link.unlink()
-            link.symlink_to(script)
-            path_line = f'\nexport PATH="$HOME/.local/bin:$PATH"\n'
-            for rc in [".zshrc", ".bash_profile", ".profile"]:
-                rc_path = Path.home() / rc
-                if rc_path.exists():
-                    content = rc_path.read_text()
-                    if ".local/bin" not in content:
-                        rc_path.write_text(content + path_line)
+        local_bin = Path.home() / ".local" / "bin"
+        bin_dir = next((Path(d) for d in ("/usr/local/bin", "/opt/homebrew/bin")
+                        if os.access(d, os.W_OK)), local_bin)
+        bin_dir.mkdir(parents=True, exist_ok=True)
+        link = bin_dir / "mindsql"
+        link.unlink(missing_ok=True)
+        link.symlink_to(script)
+
+        # User-local fallback needs ~/.local/bin on PATH
+        if bin_dir == local_bin:
+            _add_local_bin_to_rc(".zshrc", ".bash_profile", ".profile")
 
     # ── DESKTOP SHORTCUT ──────────────────────────────────────────────────────
     def _create_shortcut(self):
@@ -826,10 +1263,10 @@ class MindSQLInstaller(ctk.CTk):
         try:
             desktop = Path.home() / "Desktop"
             cmd_file = desktop / "MindSQL.command"
-            cmd_file.write_text(
+            cmd_file.write_bytes((
                 "#!/bin/bash\n"
                 f'"{sys.executable}" "{INSTALL_DIR / "main.py"}" shell\n'
-            )
+            ).encode("utf-8"))
             cmd_file.chmod(0o755)
         except Exception as e:
             print(f"[Shortcut macOS] {e}")
@@ -856,5 +1293,12 @@ class MindSQLInstaller(ctk.CTk):
 
 
 # ── ENTRY POINT ───────────────────────────────────────────────────────────────
-if __name__ == "__main__":
+def main():
+    # Theme setup touches Tk – do it only when the window is really shown
+    ctk.set_appearance_mode("Dark")
+    ctk.set_default_color_theme("dark-blue")
     MindSQLInstaller().mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,30 +5,18 @@ Main entry point and interactive shell.
 """
 
 import re
-import sys
-import os
-import csv
-import getpass
 import time
+from functools import lru_cache
 
 import typer
-from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.engine.url import make_url
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.styles import Style
 from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.table import Table
-from rich import box
 
 import config
 from ui import console, print_banner, draw_ascii_bar_chart
-from database import load_file, save_file, perform_connection, execute_sql
-from validator import validate_plot_sql, validate_sql_schema, extract_sql
-from ai_engine import mindsql_start, chat_with_model
-from sql_completer import SQLCompleter
-from schema_manager import update_schema_context
+
+# SQLAlchemy, prompt_toolkit, Ollama, the SQL parsers and the less common
+# stdlib/Rich modules are imported where they are used, so `mindsql --help`
+# starts without loading any of them.
 
 app = typer.Typer(help="MindSQL – AI-Powered Database Terminal", add_completion=False)
 
@@ -61,8 +49,40 @@ STRICT_INSTRUCTION = (
     "4. For structure questions output 'SCHEMA_ANSWER:' + plain-English answer."
 )
 
-def _instruction(mode):
-    return {"plot": PLOT_INSTRUCTION, "ans": ANS_INSTRUCTION}.get(mode, STRICT_INSTRUCTION)
+# Shell commands, matched case-insensitively in one pass. Each alternative
+# has exactly one named group, so m.lastgroup is the mode and its text the
+# argument; no match means the line is raw SQL.
+_CMD_RE = re.compile(r"""
+      (?P<exit>exit|quit|\\q)$
+    | (?P<help>help|\\h|\?)$
+    | (?P<connect>(?:mindsql\s+)?connect)$
+    | mindsql\s+connect\s+(?P<connect_url>.+)
+    | (?:mindsql\s+)?use\s+(?P<use>.+)
+    | (?P<databases>mindsql\s+databases|show\s+databases|\\l)$
+    | mindsql_export\s+(?P<export>.+)
+    | mindsql_plot\s+(?P<plot>.+)
+    | mindsql_ans\s+(?P<ans>.+)
+    | mindsql(?P<strict>(?:\s.*)?)$
+""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+_LIST_TABLES_RE = re.compile(r"what tables|list tables|show tables|all tables")
+_DESCRIBE_RE    = re.compile(r"columns|describe|what is in")
+
+
+# Built once and shared by every request – handlers never mutate them
+_SYSTEM_MESSAGES = {
+    "plot":   {"role": "system", "content": PLOT_INSTRUCTION},
+    "ans":    {"role": "system", "content": ANS_INSTRUCTION},
+    "strict": {"role": "system", "content": STRICT_INSTRUCTION},
+}
+
+
+def _messages(mode, schema_context, natural):
+    label = "Request" if mode == "plot" else "Question"
+    return [
+        _SYSTEM_MESSAGES[mode],
+        {"role": "user", "content": f"Schema:\n{schema_context}\n\n{label}: {natural}"},
+    ]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -72,12 +92,60 @@ def _instruction(mode):
 def _ask(label, default="", password=False):
     """Prompts the user for input. Uses getpass for passwords (hidden input)."""
     if password:
+        import getpass
         return getpass.getpass(f"  {label}: ")
     display = f"  {label} [{default}]: " if default else f"  {label}: "
     val = input(display).strip()
     return val if val else default
 
 
+_SYSTEM_DBS = frozenset({"information_schema", "performance_schema", "mysql", "sys"})
+
+# (host, port, username) → database names from the last SHOW DATABASES
+_KNOWN_DATABASES = {}
+
+
+def _mysql_url(host, port, username, password, database=None):
+    """MySQL URL with every part escaped, so '@', '/' or ':' in a password is safe."""
+    from sqlalchemy.engine import URL
+    return URL.create(
+        "mysql+pymysql", username=username, password=password,
+        host=host, port=int(port), database=database,
+    ).render_as_string(hide_password=False)
+
+
+def _list_databases(host, port, username, password):
+    """Runs SHOW DATABASES on the server and remembers the names for validation."""
+    from sqlalchemy import text
+    server_url = _mysql_url(host, port, username, password)
+    try:
+        with _admin_engine(server_url).connect() as conn:
+            databases = conn.execute(text("SHOW DATABASES;")).scalars().all()
+    except Exception:
+        _ADMIN_ENGINES.pop(server_url, None)
+        raise
+    _KNOWN_DATABASES[(host, port, username)] = frozenset(databases)
+    return databases
+
+
+_ADMIN_ENGINES = {}   # server URL (no database) → engine used to list databases
+
+def _admin_engine(server_url):
+    """
+    One small pooled engine per server/credentials, reused across guided
+    connects instead of a throwaway engine paying TCP + auth every time.
+    Pre-ping because it sits idle while the user types.
+    """
+    engine = _ADMIN_ENGINES.get(server_url)
+    if engine is None:
+        from sqlalchemy import create_engine
+        engine = _ADMIN_ENGINES[server_url] = create_engine(
+            server_url, connect_args={"connect_timeout": 10},
+            pool_size=1, max_overflow=0, pool_pre_ping=True, pool_recycle=3600,
+        )
+    return engine
+
+
 def _interactive_connect(current_db_url=None):
     """
     Guided step-by-step MySQL connection.
@@ -110,16 +178,11 @@ def _interactive_connect(current_db_url=None):
     config.LAST_PASSWORD = password
 
     # ── Step 2: Connect to server and list databases ───────────────────────
-    server_url = f"mysql+pymysql://{username}:{password}@{host}:{port}/"
     console.print()
 
     with console.status("[cyan]Connecting to MySQL server…[/cyan]", spinner="dots"):
         try:
-            tmp = create_engine(server_url, connect_args={"connect_timeout": 10})
-            with tmp.connect() as conn:
-                rows = conn.execute(text("SHOW DATABASES;")).fetchall()
-            databases = [r[0] for r in rows]
-            tmp.dispose()
+            databases = _list_databases(host, port, username, password)
         except Exception as exc:
             console.print(Panel(
                 f"[red]❌  Connection failed[/red]\n\n{exc}\n\n"
@@ -129,10 +192,12 @@ def _interactive_connect(current_db_url=None):
             return None, None, ""
 
     # ── Step 3: Show available databases ──────────────────────────────────
-    system_dbs = {"information_schema", "performance_schema", "mysql", "sys"}
-    user_dbs   = [db for db in databases if db.lower() not in system_dbs]
+    user_dbs   = [db for db in databases if db.lower() not in _SYSTEM_DBS]
     show_list  = user_dbs if user_dbs else databases
 
+    from rich.table import Table
+    from rich import box
+
     console.print()
     tbl = Table(title="Available Databases", box=box.ROUNDED, border_style="cyan")
     tbl.add_column("#",        style="dim",        width=5)
@@ -157,10 +222,16 @@ def _interactive_connect(current_db_url=None):
         else:
             console.print(f"[red]❌  Invalid number. Pick 1–{len(show_list)}.[/red]")
             return None, None, ""
+    elif db_choice not in databases:
+        console.print(f"[red]❌  Unknown database '{db_choice}'.[/red]")
+        return None, None, ""
 
     # ── Step 5: Connect to the chosen database ────────────────────────────
-    full_url = f"mysql+pymysql://{username}:{password}@{host}:{port}/{db_choice}"
-    engine, _ = perform_connection(full_url)
+    from database import perform_connection
+    from schema_manager import update_schema_context
+    full_url = _mysql_url(host, port, username, password, db_choice)
+    # SHOW DATABASES just succeeded on this server – no need to probe it again
+    engine, _ = perform_connection(full_url, reachable=True)
     if engine:
         schema_context = update_schema_context(engine)
         return engine, full_url, schema_context
@@ -173,6 +244,10 @@ def _switch_database(db_name, current_db_url=None):
     in config from the last `mindsql connect` call.
     Falls back to parsing the saved URL if no session credentials exist.
     """
+    from sqlalchemy.engine.url import make_url
+    from database import perform_connection
+    from schema_manager import update_schema_context
+
     host     = getattr(config, "LAST_HOST",     None)
     port     = getattr(config, "LAST_PORT",     None)
     username = getattr(config, "LAST_USERNAME", None)
@@ -193,9 +268,24 @@ def _switch_database(db_name, current_db_url=None):
         console.print("[yellow]No saved credentials. Running guided connect…[/yellow]")
         return _interactive_connect(current_db_url)
 
-    new_url = f"mysql+pymysql://{username}:{password}@{host}:{port}/{db_name}"
+    # Only names the server itself lists are accepted. A list fetched earlier
+    # in the session answers hits locally; a miss re-asks the server once, in
+    # case the database was created after that list was taken
+    known = _KNOWN_DATABASES.get((host, port, username))
+    if known is None or db_name not in known:
+        try:
+            known = _list_databases(host, port, username, password)
+        except Exception as exc:
+            console.print(f"[red]❌  Could not list databases: {exc}[/red]")
+            return None, current_db_url, ""
+    if db_name not in known:
+        console.print(f"[red]❌  Unknown database '{db_name}'. Try: mindsql databases[/red]")
+        return None, current_db_url, ""
+
+    new_url = _mysql_url(host, port, username, password, db_name)
     console.print(f"\n[cyan]Switching to[/cyan] [bold cyan]{db_name}[/bold cyan]…")
-    engine, _ = perform_connection(new_url)
+    # The server answered SHOW DATABASES this session – skip the TCP preflight
+    engine, _ = perform_connection(new_url, reachable=True)
     if engine:
         schema_context = update_schema_context(engine)
         return engine, new_url, schema_context
@@ -204,17 +294,23 @@ def _switch_database(db_name, current_db_url=None):
 
 def _show_databases(engine):
     """Lists all databases on the connected MySQL server."""
+    from sqlalchemy import text
+    from rich.table import Table
+    from rich import box
     try:
-        with engine.connect() as conn:
-            rows = conn.execute(text("SHOW DATABASES;")).fetchall()
-        system_dbs = {"information_schema", "performance_schema", "mysql", "sys"}
         tbl = Table(title="Databases on Server", box=box.ROUNDED, border_style="cyan")
         tbl.add_column("#",        style="dim", width=5)
         tbl.add_column("Database", style="bold cyan")
         tbl.add_column("",        style="dim")
-        for i, (db,) in enumerate(rows, 1):
-            tag = "system" if db.lower() in system_dbs else ""
-            tbl.add_row(str(i), db, tag)
+        # Rows go straight from the cursor into the table (and the name cache)
+        names = []
+        with engine.connect() as conn:
+            for i, db in enumerate(conn.execute(text("SHOW DATABASES;")).scalars(), 1):
+                tag = "system" if db.lower() in _SYSTEM_DBS else ""
+                tbl.add_row(str(i), db, tag)
+                names.append(db)
+        url = engine.url
+        _KNOWN_DATABASES[(str(url.host), str(url.port or "3306"), str(url.username))] = frozenset(names)
         console.print(tbl)
         console.print("[dim]Tip: mindsql use <name>  to switch[/dim]")
     except Exception as exc:
@@ -225,18 +321,36 @@ def _show_databases(engine):
 # SHELL COMMAND
 # ─────────────────────────────────────────────────────────────────────────────
 @app.command()
-def shell():
+def shell(
+    refresh_schema: bool = typer.Option(
+        False, "--refresh-schema", help="Ignore the cached schema and re-read it from the database."
+    ),
+):
     """Launch the interactive MindSQL terminal."""
+    from sqlalchemy.engine.url import make_url
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+    from prompt_toolkit.styles import Style
+    from database import load_file, perform_connection, execute_sql
+    from ai_engine import warm_up
+    from sql_completer import SQLCompleter
+    from schema_manager import register_completer, update_schema_context
+
+    warm_up(config.WARMUP_INTERVAL)   # Load the model while we connect
     db_url = load_file(config.DB_URL_FILE)
     engine = None
     schema_context = ""
+    completer = SQLCompleter()
+    register_completer(completer)
 
     # Auto-reconnect to last used database
     if db_url:
         console.print("[dim]Auto-connecting to last database…[/dim]")
-        engine, _ = perform_connection(db_url)
+        engine, _ = perform_connection(db_url, refresh_schema=refresh_schema)
         if engine:
-            schema_context = update_schema_context(engine)
+            # Sync the schema maps behind the banner and first prompt; the
+            # loop collects the result before the first command runs
+            _SCHEMA_REFRESH.append(_schema_executor().submit(update_schema_context, engine))
             # Pre-load credentials from saved URL so `mindsql use` works instantly
             try:
                 p = make_url(db_url)
@@ -252,7 +366,7 @@ def shell():
     session = PromptSession(
         history=FileHistory(config.HISTORY_FILE),
         style=Style.from_dict({"prompt": "ansicyan bold"}),
-        completer=SQLCompleter(),
+        completer=completer,
     )
 
     if engine:
@@ -266,38 +380,45 @@ def shell():
             title="🧠  MindSQL", border_style="yellow", padding=(1, 2)
         ))
 
+    prompt_key = prompt_tokens = None
     while True:
         try:
-            # Build dynamic prompt showing current DB name
-            if engine and db_url:
-                try:    db_label = make_url(db_url).database or "?"
-                except: db_label = "?"
-                prompt_tokens = [
-                    ("class:prompt", "MindSQL"),
-                    ("", f" ({db_label})"),
-                    ("class:prompt", " ❯ "),
-                ]
-            else:
-                prompt_tokens = [("class:prompt", "MindSQL (not connected) ❯ ")]
+            # Dynamic prompt showing current DB name – the URL is only
+            # re-parsed when the connection actually changed
+            if (engine is not None, db_url) != prompt_key:
+                prompt_key = (engine is not None, db_url)
+                if engine and db_url:
+                    try:    db_label = make_url(db_url).database or "?"
+                    except: db_label = "?"
+                    prompt_tokens = [
+                        ("class:prompt", "MindSQL"),
+                        ("", f" ({db_label})"),
+                        ("class:prompt", " ❯ "),
+                    ]
+                else:
+                    prompt_tokens = [("class:prompt", "MindSQL (not connected) ❯ ")]
 
             raw = session.prompt(prompt_tokens).strip()
             if not raw:
                 continue
+            schema_context = _collect_schema_refresh(schema_context)
 
-            cmd = raw.lower().strip()
+            m = _CMD_RE.match(raw)
+            mode = m.lastgroup if m else None
+            arg = (m.group(mode) or "").strip() if m else ""
 
             # ── EXIT ──────────────────────────────────────────────────────
-            if cmd in ("exit", "quit", "\\q"):
+            if mode == "exit":
                 console.print("[dim]Goodbye.[/dim]")
                 break
 
             # ── HELP ──────────────────────────────────────────────────────
-            if cmd in ("help", "\\h", "?"):
+            if mode == "help":
                 _print_help()
                 continue
 
             # ── MINDSQL CONNECT  (no args = guided interactive setup) ─────
-            if cmd in ("mindsql connect", "connect"):
+            if mode == "connect":
                 new_engine, new_url, new_schema = _interactive_connect(db_url)
                 if new_engine:
                     engine, db_url, schema_context = new_engine, new_url, new_schema
@@ -305,8 +426,8 @@ def shell():
                 continue
 
             # ── MINDSQL CONNECT <raw url>  (advanced users) ───────────────
-            if cmd.startswith("mindsql connect "):
-                target = raw[16:].strip()
+            if mode == "connect_url":
+                target = arg
                 if "://" in target:
                     new_engine, _ = perform_connection(target)
                     if new_engine:
@@ -321,9 +442,9 @@ def shell():
                 continue
 
             # ── MINDSQL USE <dbname>  (switch database) ───────────────────
-            if cmd.startswith("mindsql use ") or cmd.startswith("use "):
+            if mode == "use":
                 # grab the last word which is the DB name
-                db_name = raw.strip().rsplit(None, 1)[-1]
+                db_name = arg.rsplit(None, 1)[-1]
                 new_engine, new_url, new_schema = _switch_database(db_name, db_url)
                 if new_engine:
                     engine, db_url, schema_context = new_engine, new_url, new_schema
@@ -331,7 +452,7 @@ def shell():
                 continue
 
             # ── MINDSQL DATABASES  (list DBs on server) ───────────────────
-            if cmd in ("mindsql databases", "show databases", "\\l"):
+            if mode == "databases":
                 if not engine:
                     console.print("[red]❌  Not connected.[/red]")
                     continue
@@ -339,30 +460,27 @@ def shell():
                 continue
 
             # ── EXPORT ────────────────────────────────────────────────────
-            if cmd.startswith("mindsql_export "):
+            if mode == "export":
                 if not engine: console.print("[red]❌  Not connected.[/red]"); continue
-                _handle_export(engine, raw[15:].strip())
+                _handle_export(engine, arg, schema_context)
                 continue
 
             # ── PLOT ──────────────────────────────────────────────────────
-            if cmd.startswith("mindsql_plot "):
+            if mode == "plot":
                 if not engine: console.print("[red]❌  Not connected.[/red]"); continue
-                _handle_plot(engine, raw[13:].strip(), schema_context)
+                _handle_plot(engine, arg, schema_context)
                 continue
 
             # ── ANS / CHAT ────────────────────────────────────────────────
-            if cmd.startswith("mindsql_ans "):
+            if mode == "ans":
                 if not engine: console.print("[red]❌  Not connected.[/red]"); continue
-                engine, schema_context = _handle_ans(engine, raw[12:].strip(), schema_context)
+                engine, schema_context = _handle_ans(engine, arg, schema_context)
                 continue
 
             # ── STRICT AI ─────────────────────────────────────────────────
-            if cmd.startswith("mindsql ") or cmd == "mindsql":
+            if mode == "strict":
                 if not engine: console.print("[red]❌  Not connected.[/red]"); continue
-                prompt_text = raw[7:].strip()
-                if _shortcircuit_schema(engine, prompt_text):
-                    continue
-                engine, schema_context = _handle_strict(engine, prompt_text, schema_context)
+                engine, schema_context = _handle_strict(engine, arg, schema_context)
                 continue
 
             # ── RAW SQL ───────────────────────────────────────────────────
@@ -373,6 +491,8 @@ def shell():
                 )
                 continue
             execute_sql(engine, raw)
+            if _is_ddl(raw):
+                _refresh_schema(engine)
 
         except KeyboardInterrupt:
             console.print()
@@ -387,57 +507,72 @@ def shell():
 # AI MODE HANDLERS
 # ─────────────────────────────────────────────────────────────────────────────
 def _handle_plot(engine, natural, schema_context):
-    msgs = [
-        {"role": "system", "content": _instruction("plot")},
-        {"role": "user",   "content": f"Schema:\n{schema_context}\n\nRequest: {natural}"},
-    ]
-    for attempt in range(config.MAX_RETRIES):
+    from database import stream_rows, capped_rows
+    from validator import validate_plot_sql
+    from ai_engine import accept_sql, reject_sql
+
+    msgs = _messages("plot", schema_context, natural)
+    retries = config.MAX_RETRIES
+    for attempt in range(retries):
         with console.status(f"[yellow]📊 Generating (attempt {attempt+1})…[/yellow]", spinner="earth"):
-            sql = mindsql_start(msgs)
+            sql = _generate_sql(engine, msgs)
         if sql.startswith("CLARIFICATION_NEEDED:"):
-            console.print(Panel(sql.replace("CLARIFICATION_NEEDED:", "").strip(),
+            console.print(Panel(sql.removeprefix("CLARIFICATION_NEEDED:").strip(),
                                 title="⚠ Clarification Needed", border_style="yellow"))
             return
         if not validate_plot_sql(sql):
-            if attempt < config.MAX_RETRIES - 1:
-                msgs[1]["content"] += "\n\nERROR: Return exactly 2 cols: LABEL and aggregated VALUE."
+            reject_sql(sql)
+            if attempt < retries - 1:
+                _add_retry_error(msgs, "Return exactly 2 cols: LABEL and aggregated VALUE.")
             continue
-        data = execute_sql(engine, sql, return_data=True)
-        if data:
-            draw_ascii_bar_chart(data)
+        try:
+            with stream_rows(engine, sql) as rows:
+                if rows is None:
+                    reject_sql(sql)
+                    return
+                draw_ascii_bar_chart(capped_rows(rows))
+        except Exception as exc:
+            # The chart is only printed once every row is in – nothing partial shown
+            reject_sql(sql)
+            console.print(Panel(f"[bold red]SQL Error[/bold red]\n{exc}", style="red"))
+            return
+        accept_sql(sql)
         return
     console.print("[red]Plot failed after retries.[/red]")
 
 
 def _handle_ans(engine, natural, schema_context):
+    from prompt_toolkit.shortcuts import confirm
+    from database import execute_sql
+    from validator import extract_sql
+    from ai_engine import chat_with_model
+
     if _shortcircuit_schema(engine, natural):
         return engine, schema_context
-    msgs = [
-        {"role": "system", "content": _instruction("ans")},
-        {"role": "user",   "content": f"Schema:\n{schema_context}\n\nQuestion: {natural}"},
-    ]
-    for attempt in range(config.MAX_RETRIES):
+    msgs = _messages("ans", schema_context, natural)
+    retries = config.MAX_RETRIES
+    for attempt in range(retries):
         with console.status(f"[green]💬 Thinking (attempt {attempt+1})…[/green]", spinner="dots"):
             resp = chat_with_model(msgs)
         full = resp["message"]["content"]
         if full.startswith("SCHEMA_ANSWER:"):
-            console.print(Panel(full.replace("SCHEMA_ANSWER:", "").strip(),
+            console.print(Panel(full.removeprefix("SCHEMA_ANSWER:").strip(),
                                 title="🏗️ Schema Info", border_style="cyan"))
             return engine, schema_context
         console.print(Panel(full, title="🤖 AI Answer", border_style="green"))
         sql = extract_sql(full)
         if sql:
-            if input("▶ Execute suggested SQL? (y/n): ").strip().lower() == "y":
+            if confirm("▶ Execute suggested SQL?"):
                 try:
                     execute_sql(engine, sql, raise_error=True)
                     if _is_ddl(sql):
-                        schema_context = update_schema_context(engine)
+                        _refresh_schema(engine)
                     break
                 except Exception as exc:
-                    if attempt < config.MAX_RETRIES - 1:
-                        msgs[1]["content"] += f"\n\nERROR: {exc}\nFix the SQL."
+                    if attempt < retries - 1:
+                        _add_retry_error(msgs, f"{exc}\nFix the SQL.")
                     else:
-                        console.print(f"[red]Failed after {config.MAX_RETRIES} attempts.[/red]")
+                        console.print(f"[red]Failed after {retries} attempts.[/red]")
             else:
                 break
         else:
@@ -446,82 +581,231 @@ def _handle_ans(engine, natural, schema_context):
 
 
 def _handle_strict(engine, natural, schema_context):
-    msgs = [
-        {"role": "system", "content": _instruction("strict")},
-        {"role": "user",   "content": f"Schema:\n{schema_context}\n\nQuestion: {natural}"},
-    ]
-    for attempt in range(config.MAX_RETRIES):
+    from prompt_toolkit.shortcuts import confirm
+    from rich.syntax import Syntax
+    from database import execute_sql
+    from validator import validate_sql_schema, extract_sql
+    from ai_engine import accept_sql, reject_sql
+
+    if _shortcircuit_schema(engine, natural):
+        return engine, schema_context
+    msgs = _messages("strict", schema_context, natural)
+    retries, schema_map = config.MAX_RETRIES, config.SCHEMA_MAP
+    for attempt in range(retries):
         with console.status(f"[yellow]🧠 Generating (attempt {attempt+1})…[/yellow]", spinner="earth"):
-            sql = mindsql_start(msgs)
-        if sql.startswith("CLARIFICATION_NEEDED:"):
-            console.print(Panel(sql.replace("CLARIFICATION_NEEDED:", "").strip(),
+            generated = _generate_sql(engine, msgs)
+        if generated.startswith("CLARIFICATION_NEEDED:"):
+            console.print(Panel(generated.removeprefix("CLARIFICATION_NEEDED:").strip(),
                                 title="⚠ Clarification Needed", border_style="yellow"))
             return engine, schema_context
-        if sql.startswith("SCHEMA_ANSWER:"):
-            console.print(Panel(sql.replace("SCHEMA_ANSWER:", "").strip(),
+        if generated.startswith("SCHEMA_ANSWER:"):
+            console.print(Panel(generated.removeprefix("SCHEMA_ANSWER:").strip(),
                                 title="🏗️ Schema Info", border_style="cyan"))
             return engine, schema_context
-        sql = extract_sql(sql) or sql
+        sql = extract_sql(generated) or generated
         console.print(Panel(Syntax(sql, "sql", theme="monokai"),
                             title="✨ Generated SQL", border_style="yellow"))
-        if input("🚀 Execute? (y/n): ").strip().lower() != "y":
-            return engine, schema_context
-        if not validate_sql_schema(sql, config.SCHEMA_MAP):
+        # Validate before asking: a doomed query goes straight back to the
+        # model instead of waiting on the user's keystroke first
+        if not validate_sql_schema(sql, schema_map):
             console.print("[red]❌ Schema validation failed.[/red]")
-            if attempt < config.MAX_RETRIES - 1:
-                msgs[1]["content"] += "\n\nERROR: Column/table not found. Re-read schema and fix."
+            reject_sql(generated)
+            if attempt < retries - 1:
+                _add_retry_error(msgs, "Column/table not found. Re-read schema and fix.")
             continue
-        execute_sql(engine, sql)
+        if not confirm("🚀 Execute?"):
+            return engine, schema_context
+        try:
+            execute_sql(engine, sql, raise_error=True)
+        except Exception as exc:
+            reject_sql(generated)
+            console.print(Panel(f"[bold red]SQL Error[/bold red]\n{exc}", style="red"))
+            break
+        accept_sql(generated)
         if _is_ddl(sql):
-            schema_context = update_schema_context(engine)
+            _refresh_schema(engine)
         break
     return engine, schema_context
 
 
-def _handle_export(engine, natural):
-    msgs = [
-        {"role": "system", "content": STRICT_INSTRUCTION},
-        {"role": "user",   "content": f"Schema:\n{load_file(config.SCHEMA_FILE)}\n\nQuestion: {natural}"},
-    ]
+def _handle_export(engine, natural, schema_context):
+    from prompt_toolkit.shortcuts import confirm
+    from rich.syntax import Syntax
+    from database import stream_rows
+    from validator import extract_sql
+    from ai_engine import mindsql_start, accept_sql, reject_sql
+
+    msgs = _messages("strict", schema_context, natural)
     with console.status("[cyan]🗂 Generating export SQL…[/cyan]", spinner="dots"):
-        sql = mindsql_start(msgs)
-    sql = extract_sql(sql) or sql
+        generated = mindsql_start(msgs)
+    sql = extract_sql(generated) or generated
     console.print(Panel(Syntax(sql, "sql", theme="monokai"), title="Export SQL", border_style="cyan"))
-    if input("Export to CSV? (y/n): ").strip().lower() != "y":
+    if not confirm("Export to CSV?"):
         return
-    data = execute_sql(engine, sql, return_data=True)
-    if not data:
-        console.print("[yellow]No data to export.[/yellow]")
+    import csv
+    import os
+
+    # Rows go from the server-side cursor to disk one partition at a time,
+    # so memory stays at one batch however large the export is. They land in
+    # a .part file that only replaces the real name once every row is in.
+    # Nanosecond stamp: two exports in the same second no longer collide
+    out_file = f"mindsql_export_{time.time_ns()}.csv"
+    part_file = out_file + ".part"
+    count, started = 0, False
+    try:
+        with stream_rows(engine, sql) as result:
+            if result is None:
+                reject_sql(generated)
+                return
+            batches = result.partitions(config.FETCH_SIZE) if result else iter(())
+            first = next(batches, None)
+            if not first:
+                accept_sql(generated)
+                console.print("[yellow]No data to export.[/yellow]")
+                return
+            started = True
+            with open(part_file, "x", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(result.keys())
+                writer.writerows(first)
+                count = len(first)
+                for batch in batches:
+                    writer.writerows(batch)
+                    count += len(batch)
+        os.replace(part_file, out_file)
+    except Exception as exc:
+        if started:
+            try:
+                os.remove(part_file)
+            except OSError:
+                pass
+        reject_sql(generated)
+        console.print(Panel(
+            f"[bold red]Export failed after {count} rows – no file written.[/bold red]\n{exc}",
+            style="red",
+        ))
         return
-    out_file = f"mindsql_export_{int(time.time())}.csv"
-    with open(out_file, "w", newline="", encoding="utf-8") as f:
-        csv.writer(f).writerows(data)
-    console.print(Panel(f"[green]✅ {len(data)} rows → {out_file}[/green]", border_style="green"))
+    accept_sql(generated)
+    console.print(Panel(f"[green]✅ {count} rows → {out_file}[/green]", border_style="green"))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # UTILITIES
 # ─────────────────────────────────────────────────────────────────────────────
+_INSPECTED = {}   # (url, method, *args) → inspector result; cleared after DDL
+
+def _inspect_cached(engine, method, *args):
+    """Memoises Inspector lookups so repeat schema questions skip the DB round-trip."""
+    key = (str(engine.url), method, *args)
+    if key not in _INSPECTED:
+        from sqlalchemy import inspect
+        _INSPECTED[key] = getattr(inspect(engine), method)(*args)
+    return _INSPECTED[key]
+
+
+@lru_cache(maxsize=1)
+def _table_matcher(tables):
+    """
+    One alternation over every table name (longest first, so 'order_items'
+    wins over 'order'), rebuilt only when the set of tables changes.
+    """
+    if not tables:
+        return None, {}
+    alts = "|".join(re.escape(t) for t in sorted(tables, key=len, reverse=True))
+    return re.compile(alts, re.IGNORECASE), {t.lower(): t for t in tables}
+
+
+def _find_table(prompt):
+    """First table named in prompt, in one scan regardless of schema size."""
+    pattern, names = _table_matcher(tuple(config.SCHEMA_MAP))
+    m = pattern.search(prompt) if pattern else None
+    return names[m.group().lower()] if m else None
+
+
 def _shortcircuit_schema(engine, prompt):
     if not engine: return False
     low = prompt.lower()
-    inspector = inspect(engine)
-    if any(w in low for w in ("what tables","list tables","show tables","all tables")):
-        console.print(Panel(", ".join(inspector.get_table_names()),
-                            title="📋 Tables", border_style="cyan"))
+    # Answered from the reflected schema; the inspector is only a fallback
+    # for when no schema has been loaded
+    if _LIST_TABLES_RE.search(low):
+        tables = list(config.SCHEMA_MAP) or _inspect_cached(engine, "get_table_names")
+        console.print(Panel(", ".join(tables), title="📋 Tables", border_style="cyan"))
         return True
-    if any(w in low for w in ("columns","describe","what is in")):
-        match = next((t for t in config.SCHEMA_MAP if t in low), None)
+    if _DESCRIBE_RE.search(low):
+        match = _find_table(prompt)
         if match:
-            cols = inspector.get_columns(match)
-            detail = "\n".join(f"  • {c['name']}  ({c['type']})" for c in cols)
+            cols = config.SCHEMA_COLUMNS.get(match) or [
+                (c["name"], c["type"]) for c in _inspect_cached(engine, "get_columns", match)
+            ]
+            detail = "\n".join(f"  • {name}  ({col_type})" for name, col_type in cols)
             console.print(Panel(detail, title=f"📋 {match}", border_style="cyan"))
             return True
     return False
 
 
+def _add_retry_error(msgs, error):
+    """
+    Feeds a failed attempt back to the model in a trailing message of its
+    own, so the schema-sized prompt is never re-copied on retry.
+    """
+    if len(msgs) == 2:
+        msgs.append({"role": "user", "content": f"ERROR: {error}"})
+    else:
+        msgs[2]["content"] += f"\n\nERROR: {error}"
+
+
+def _generate_sql(engine, msgs):
+    """Runs SQL generation while a pooled DB connection warms up in parallel."""
+    import threading
+    from database import warm_connection
+    from ai_engine import mindsql_start
+
+    # Generation stays on the main thread so Ctrl+C still interrupts it
+    threading.Thread(target=warm_connection, args=(engine,), daemon=True).start()
+    return mindsql_start(msgs)
+
+
+_DDL_RE = re.compile(r"\s*(?:CREATE|DROP|ALTER)\s", re.IGNORECASE)
+
 def _is_ddl(sql):
-    return sql.strip().upper().startswith(("CREATE ", "DROP ", "ALTER "))
+    # Matches at the head only – no upper-cased copy of a long script
+    return _DDL_RE.match(sql) is not None
+
+
+_SCHEMA_REFRESH = []   # pending update_schema_context futures, oldest first
+
+
+@lru_cache(maxsize=1)
+def _schema_executor():
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="schema-refresh")
+
+
+def _refresh_schema(engine):
+    """
+    Drops the now-stale schema cache after DDL and re-syncs the schema on a
+    worker thread, so the prompt comes back without waiting for reflection.
+    """
+    from database import clear_schema_cache
+    from schema_manager import update_schema_context
+
+    clear_schema_cache()
+    _INSPECTED.clear()
+    _KNOWN_DATABASES.clear()   # CREATE/DROP DATABASE changes the server's list
+    _SCHEMA_REFRESH.append(_schema_executor().submit(update_schema_context, engine))
+
+
+def _collect_schema_refresh(schema_context):
+    """
+    Picks up a finished background refresh before the next command runs,
+    waiting for it if the user typed faster than the schema reflected.
+    """
+    while _SCHEMA_REFRESH:
+        try:
+            schema_context = _SCHEMA_REFRESH.pop(0).result()
+        except Exception as exc:
+            console.print(f"[yellow]⚠ Schema refresh failed: {exc}[/yellow]")
+    return schema_context
 
 
 def _print_help():
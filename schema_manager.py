@@ -1,49 +1,40 @@
 # schema_manager.py
 
-from sqlalchemy import inspect
+import weakref
+
 import config
+from database import reflect_schema, write_schema_file, schema_column_map
+
+_completer_ref = None   # weakref to the shell's SQLCompleter
+
+def register_completer(completer):
+    """Remembers the shell's completer so each schema update refreshes it."""
+    global _completer_ref
+    _completer_ref = weakref.ref(completer)
 
 def update_schema_context(engine):
     """
     Extracts live DB schema, including Primary and Foreign Keys, 
     and dynamically updates the in-memory validation map.
+    Reflection is batched per dialect and cached in database.reflect_schema.
     """
-    inspector = inspect(engine)
-    schema_text = ""
-    dynamic_schema_map = {}
-    
-    for table_name in inspector.get_table_names():
-        schema_text += f"CREATE TABLE {table_name} (\n"
-        columns = inspector.get_columns(table_name)
-        col_names = []
-        
-        for i, col in enumerate(columns):
-            col_names.append(col['name'])
-            comma = "," if i < len(columns) - 1 else ""
-            schema_text += f"    {col['name']} {col['type']}{comma}\n"
-        
-        schema_text += ");\n"
-        
-        # Extract Primary Keys
-        pks = inspector.get_pk_constraint(table_name).get('constrained_columns', [])
-        if pks:
-            schema_text += f"-- Primary Keys: {', '.join(pks)}\n"
-            
-        # Extract Foreign Keys
-        fks = inspector.get_foreign_keys(table_name)
-        if fks:
-            fk_strs = [f"({', '.join(fk['constrained_columns'])}) references {fk['referred_table']}({', '.join(fk['referred_columns'])})" for fk in fks]
-            schema_text += f"-- Foreign Keys: {', '.join(fk_strs)}\n"
-            
-        schema_text += "\n"
-        dynamic_schema_map[table_name] = col_names
-        
+    schema = reflect_schema(engine)
+
     # Overwrite the stale schema file on the disk
-    with open(config.SCHEMA_FILE, 'w') as f:
-        f.write(schema_text)
-        
-    # Dynamically update the config map in memory
-    config.SCHEMA_MAP.clear()
-    config.SCHEMA_MAP.update(dynamic_schema_map)
-        
-    return schema_text
\ No newline at end of file
+    schema_text = write_schema_file(schema)
+
+    # Dynamically update the config maps in memory (left alone when unchanged)
+    columns = {table: [tuple(col) for col in info["columns"]] for table, info in schema.items()}
+    schema_map = schema_column_map(schema)
+    # Rebound, never cleared and refilled: this may run on the schema worker
+    # thread while the prompt thread iterates the current maps
+    if columns != config.SCHEMA_COLUMNS:
+        config.SCHEMA_COLUMNS = columns
+    if schema_map != config.SCHEMA_MAP:
+        config.SCHEMA_MAP = schema_map
+
+    completer = _completer_ref() if _completer_ref else None
+    if completer is not None:
+        completer.refresh(config.SCHEMA_MAP)
+
+    return schema_text
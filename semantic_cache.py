@@ -0,0 +1,158 @@
+# semantic_cache.py
+"""
+Semantic response cache for MindSQL.
+Re-uses SQL generated for earlier questions that mean the same thing,
+so near-identical prompts skip the Ollama round-trip entirely.
+"""
+
+import atexit
+import json
+import math
+import operator
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# C-level dot product on Python 3.12+, a map/sum fallback before that
+_dot = getattr(math, "sumprod", None) or (lambda a, b: sum(map(operator.mul, a, b)))
+
+
+class LLMCache:
+    """
+    Embedding-keyed LRU cache of (question → SQL) pairs.
+
+    Entries are partitioned by a scope key (model + system prompt + schema),
+    so a hit is only ever returned for the same database context.
+    Embeddings are L2-normalised on insert, making cosine similarity a
+    plain dot product at lookup time.
+
+    Thread-safe. Changes are written to disk after save_delay seconds of
+    quiet (and at exit), atomically, never on the request path.
+    """
+
+    def __init__(self, path: str, embed_fn, threshold: float = 0.92, capacity: int = 256,
+                 save_delay: float = 2.0, on_disable=None):
+        self.path       = path
+        self.threshold  = threshold
+        self.capacity   = capacity
+        self.save_delay = save_delay
+        self._embed_fn  = embed_fn
+        self._on_disable = on_disable   # called once with the embedding error
+        self._enabled   = True
+        # key → (scope, vector, response), oldest first
+        self._entries: OrderedDict[str, tuple[str, list[float], str]] = OrderedDict()
+        self._lock       = threading.Lock()   # guards _entries, _dirty, _timer
+        self._write_lock = threading.Lock()   # serialises file writes
+        self._dirty = False
+        self._timer: threading.Timer | None = None
+        self._load()
+        atexit.register(self.flush)
+
+    # ── Public API ────────────────────────────────────────────────────────────
+    def lookup(self, scope: str, text: str) -> tuple[str | None, list[float] | None]:
+        """
+        Returns (cached_response, query_vector).
+        The vector is handed back so a miss can be stored without re-embedding.
+        """
+        vector = self._embed(text)
+        if vector is None:
+            return None, None
+
+        with self._lock:
+            best_key, best_score = None, self.threshold
+            for key, (entry_scope, entry_vec, _) in self._entries.items():
+                if entry_scope != scope:
+                    continue
+                score = _dot(vector, entry_vec)
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                return None, vector
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2], vector
+
+    def store(self, scope: str, text: str, vector: list[float] | None, response: str):
+        """Adds a response, evicting the least-recently-used entry when full."""
+        if vector is None or not self._enabled:
+            return
+        key = f"{scope}:{text}"
+        with self._lock:
+            self._entries[key] = (scope, vector, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._schedule_save()
+
+    def discard(self, scope: str, response: str):
+        """Drops every entry in scope that answered with response."""
+        with self._lock:
+            stale = [k for k, (s, _, r) in self._entries.items() if s == scope and r == response]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._schedule_save()
+
+    def flush(self):
+        """Writes pending changes to disk now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = [[k, s, v, r] for k, (s, v, r) in self._entries.items()]
+        self._write(snapshot)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+    def _embed(self, text: str) -> list[float] | None:
+        if not self._enabled:
+            return None
+        try:
+            vector = self._embed_fn(text)
+        except Exception as exc:
+            # Embedding model missing or Ollama down – disable for this session
+            if self._enabled:
+                self._enabled = False
+                if self._on_disable is not None:
+                    self._on_disable(exc)
+            return None
+        norm = math.sqrt(_dot(vector, vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _schedule_save(self):
+        # Caller holds self._lock; one timer covers any burst of changes
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for key, scope, vector, response in json.load(f):
+                    self._entries[key] = (scope, vector, response)
+        except Exception:
+            self._entries.clear()   # Corrupt cache – start fresh
+
+    def _write(self, snapshot: list):
+        # Temp file + rename: a crash mid-write leaves the old cache intact
+        with self._write_lock:
+            tmp = None
+            try:
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                # Cache is best-effort; never block a query on disk errors
+                if tmp is not None:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
@@ -8,10 +8,27 @@ and supports comprehensive SQL vocabulary.
 
 import re
 import os
+import heapq
+from bisect import bisect_left
 from collections import Counter
+from functools import lru_cache
 from prompt_toolkit.completion import Completer, Completion
 import config
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+# The history scan covers the whole file: use RE2's linear-time DFA when
+# google-re2 is installed (its \w is ASCII-only, fine for frequency ranking)
+_HISTORY_TOKEN_RE = re2.compile(r'\b\w+\b') if re2 else _TOKEN_RE
+_HISTORY_CHUNK = 1 << 16
+# Suggestions offered per keystroke. The menu scrolls, so this bounds the
+# ranking work rather than the screen – typing more letters reaches the rest
+MAX_COMPLETIONS = 32
+
 # 1. The Context Map: Defines what logically follows what
 CONTEXT_MAP = {
     # DML & Querying
@@ -53,7 +70,7 @@ CONTEXT_MAP = {
 }
 
 # 2. The Comprehensive Keyword Dictionary
-ALL_KEYWORDS = [
+ALL_KEYWORDS = frozenset([
     # Core DML
     "SELECT", "INSERT", "UPDATE", "DELETE", "FROM", "WHERE", "VALUES", "SET",
     # DDL
@@ -68,28 +85,83 @@ ALL_KEYWORDS = [
     "COUNT", "SUM", "AVG", "MIN", "MAX", "COALESCE", "CAST", "CONCAT", "SUBSTRING", "ROUND", "NOW", "CURRENT_DATE",
     # Constraints & Data Types
     "PRIMARY KEY", "FOREIGN KEY", "UNIQUE", "NOT NULL", "DEFAULT", "INT", "VARCHAR", "TEXT", "BOOLEAN", "DATE", "TIMESTAMP"
-]
+])
+
+# Frozen once at import, so every keystroke unions ready-hashed sets
+CONTEXT_MAP = {token: frozenset(words) for token, words in CONTEXT_MAP.items()}
+
+# Every keyword any context can suggest
+VOCABULARY = ALL_KEYWORDS.union(*CONTEXT_MAP.values(), ["FROM"])
 
 def get_user_frequencies():
     """Reads the history file to calculate how often the user uses specific words."""
+    try:
+        st = os.stat(config.HISTORY_FILE)
+    except OSError:
+        return Counter()
+    # Keyed on mtime/size, so keystrokes only re-scan after a new history entry
+    return _count_history(config.HISTORY_FILE, st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=1)
+def _count_history(filename, mtime_ns, size):
     freq_map = Counter()
-    if os.path.exists(config.HISTORY_FILE):
-        try:
-            with open(config.HISTORY_FILE, "r") as f:
-                content = f.read().lower()
-                tokens = re.findall(r'\b\w+\b', content)
-                freq_map.update(tokens)
-        except Exception:
-            pass # Fail silently if history file is temporarily locked
+    try:
+        # Read in chunks so a large history is never held (twice) in memory;
+        # a word cut off at a chunk boundary is carried into the next chunk
+        with open(filename, "r", encoding="utf-8", errors="replace") as f:
+            tail = ""
+            while chunk := f.read(_HISTORY_CHUNK):
+                chunk = tail + chunk.lower()
+                cut = len(chunk)
+                while cut and (chunk[cut - 1].isalnum() or chunk[cut - 1] == "_"):
+                    cut -= 1
+                freq_map.update(_HISTORY_TOKEN_RE.findall(chunk, 0, cut))
+                tail = chunk[cut:]
+            freq_map.update(_HISTORY_TOKEN_RE.findall(tail))
+    except Exception:
+        pass # Fail silently if history file is temporarily locked
     return freq_map
 
 class SQLCompleter(Completer):
+    def __init__(self):
+        self.refresh(config.SCHEMA_MAP)
+
+    def refresh(self, schema_map):
+        """Snapshots table/column names so keystrokes never walk the schema map."""
+        columns = {table: frozenset(cols) for table, cols in schema_map.items()}
+        tables = frozenset(columns)
+        all_columns = frozenset().union(*columns.values())
+        # Sorted by lower-cased form: all words sharing a prefix sit in one
+        # contiguous run, found by bisection instead of a full scan
+        index = sorted((w.lower(), w) for w in VOCABULARY.union(tables, all_columns))
+        keys = [key for key, _ in index]
+        words = [word for _, word in index]
+        # One attribute, swapped in a single step: the schema worker thread
+        # may refresh while the prompt thread is completing
+        self._snapshot = (schema_map, tables, columns, all_columns, keys, words)
+
+    @staticmethod
+    def _prefixed(keys, words, prefix):
+        """Yields every known word whose lower-cased form starts with prefix."""
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield words[i]
+            i += 1
+
     def get_completions(self, document, complete_event):
+        # A new connection rebinds config.SCHEMA_MAP; in-place updates come
+        # through refresh() from schema_manager
+        schema_map = config.SCHEMA_MAP
+        if self._snapshot[0] is not schema_map:
+            self.refresh(schema_map)
+        _, tables, columns, all_columns, index_keys, index_words = self._snapshot
         text_before_cursor = document.text_before_cursor.lower()
         word_before_cursor = document.get_word_before_cursor()
         
-        typed_tokens = re.findall(r'\b\w+\b', text_before_cursor)
+        typed_tokens = _TOKEN_RE.findall(text_before_cursor)
+        typed_set = set(typed_tokens)
         suggestions = set()
+        last_token = ""
         
         # --- A. CONTEXT-AWARE KEYWORDS ---
         if not typed_tokens:
@@ -102,30 +174,40 @@ class SQLCompleter(Completer):
             if last_token in CONTEXT_MAP:
                 suggestions.update(CONTEXT_MAP[last_token])
             else:
-                if "select" in typed_tokens and "from" not in typed_tokens:
+                if "select" in typed_set and "from" not in typed_set:
                     suggestions.add("FROM")
                 suggestions.update(ALL_KEYWORDS)
 
         # --- B. SCHEMA AWARENESS (Tables and Columns) ---
-        active_tables = [token for token in typed_tokens if token in config.SCHEMA_MAP]
+        active_tables = [token for token in typed_set if token in columns]
         
         if last_token in ["from", "join", "update", "into", "table"]:
-            suggestions.update(config.SCHEMA_MAP.keys())
+            suggestions.update(tables)
             
-        if "select" in typed_tokens or "where" in typed_tokens or "set" in typed_tokens or "by" in typed_tokens:
+        if not typed_set.isdisjoint(("select", "where", "set", "by")):
             if not active_tables:
-                for cols in config.SCHEMA_MAP.values():
-                    suggestions.update(cols)
+                suggestions.update(all_columns)
             else:
-                for table in set(active_tables):
-                    suggestions.update(config.SCHEMA_MAP[table])
+                for table in active_tables:
+                    suggestions.update(columns[table])
 
         # --- C. FILTER BY CURRENT TYPING ---
-        valid_suggestions = [s for s in suggestions if s.lower().startswith(word_before_cursor.lower())]
+        # Lazily – matches stream straight into the ranking heap below
+        prefix = word_before_cursor.lower()
+        if prefix:
+            candidates = (s for s in self._prefixed(index_keys, index_words, prefix) if s in suggestions)
+        else:
+            candidates = iter(suggestions)
         
         # --- D. SORT BY USER FREQUENCY ---
+        # A bounded heap keeps only the top MAX_COMPLETIONS – never a full sort.
+        # Ties (every word, with no history) go shortest first, then by name,
+        # so the same input always offers the same list
         freq_map = get_user_frequencies()
-        valid_suggestions.sort(key=lambda x: freq_map.get(x.lower(), 0), reverse=True)
+        valid_suggestions = heapq.nsmallest(
+            MAX_COMPLETIONS, candidates,
+            key=lambda x: (-freq_map.get(x.lower(), 0), len(x), x.lower(), x),
+        )
 
         # --- E. YIELD TO TERMINAL ---
         for suggestion in valid_suggestions:
@@ -3,6 +3,9 @@
 User Interface elements for MindSQL using the Rich library.
 """
 
+from array import array
+from itertools import cycle
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -11,6 +14,11 @@ import config
 
 console = Console()
 
+BAR_WIDTH = 44
+# Every bar and its padding, built once – rows index instead of allocating
+_FULL  = tuple("█" * i for i in range(BAR_WIDTH + 1))
+_EMPTY = tuple("░" * i for i in range(BAR_WIDTH + 1))
+
 
 def print_banner(db_url: str):
     """Prints the MindSQL welcome banner with connection info."""
@@ -33,28 +41,38 @@ def print_banner(db_url: str):
                         box=box.ROUNDED, padding=(1, 2)))
 
 
-def draw_ascii_bar_chart(data: list):
+def draw_ascii_bar_chart(data):
     """
     Renders a color-coded horizontal bar chart in the terminal.
-    Expects: [(label, numeric_value), …]
+    Expects any iterable of (label, numeric_value) rows – consumed in one
+    pass, keeping only a label list and a packed array of values.
     """
-    if not data:
-        console.print("[yellow]No data to plot.[/yellow]")
-        return
-
+    labels: list[str] = []
+    values = array("d")
+    max_label, max_val, seen = 0, 0.0, 0
     try:
-        clean = [(str(r[0]), float(r[1])) for r in data if r[1] is not None]
+        for r in data:
+            seen += 1
+            if r[1] is None:
+                continue
+            label, value = str(r[0]), float(r[1])
+            labels.append(label)
+            values.append(value)
+            max_label = max(max_label, len(label))
+            max_val   = max(max_val, value)
     except (ValueError, TypeError, IndexError):
         console.print("[red]Plot error: data must have a label and a numeric value.[/red]")
         return
 
-    if not clean:
+    if not seen:
+        console.print("[yellow]No data to plot.[/yellow]")
+        return
+    if not values:
         console.print("[yellow]No valid numeric data.[/yellow]")
         return
 
-    max_label = max(len(d[0]) for d in clean)
-    max_val   = max(d[1] for d in clean) or 1
-    bar_width = 44
+    max_val   = max_val or 1
+    bar_width = BAR_WIDTH
 
     palette = [
         "spring_green1", "cyan1", "magenta1",
@@ -66,17 +84,23 @@ def draw_ascii_bar_chart(data: list):
     console.print(Panel("[bold]📊 Chart Result[/bold]", style="blue",
                         box=box.MINIMAL, expand=False))
 
-    for i, (label, value) in enumerate(clean):
-        filled = int((value / max_val) * bar_width)
-        bar    = "█" * filled
-        empty  = "░" * (bar_width - filled)
-        color  = palette[i % len(palette)]
-        pct    = (value / max_val) * 100
-        console.print(
+    # One division each up front; every row then needs a single multiply
+    bar_scale = bar_width / max_val
+    pct_scale = 100 / max_val
+
+    # Rows are rendered and written in one console.print, not one per bar
+    rows = []
+    for label, value, color in zip(labels, values, cycle(palette)):
+        filled = min(max(int(value * bar_scale), 0), bar_width)
+        bar    = _FULL[filled]
+        empty  = _EMPTY[bar_width - filled]
+        pct    = value * pct_scale
+        rows.append(
             f"{label.rjust(max_label)} │ "
             f"[{color}]{bar}[/{color}][dim]{empty}[/dim]"
             f"  [bold white]{value}[/bold white] [dim]({pct:.1f}%)[/dim]"
         )
+    console.print("\n".join(rows))
 
     console.print()
-    console.print(f"[dim]Total rows: {len(clean)}[/dim]\n")
+    console.print(f"[dim]Total rows: {len(values)}[/dim]\n")
@@ -4,6 +4,8 @@ Security, SQL parsing, and validation logic using SQLGlot.
 """
 
 import re
+from functools import lru_cache
+
 import sqlglot
 from sqlglot import exp
 from sql_metadata import Parser
@@ -12,6 +14,23 @@ import config
 from ui import console
 
 
+_FENCE_PATTERNS = (
+    re.compile(r"```sql\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE),
+    re.compile(r"```\s*(.*?)\s*```", re.DOTALL),
+)
+_PLOT_RE = re.compile(r"\s*SELECT\s+(.+?)\s+FROM\b", re.IGNORECASE | re.DOTALL)
+_AGGREGATE_RE = re.compile(r"\b(?:COUNT|SUM|AVG|MIN|MAX)\s*\(", re.IGNORECASE)
+
+_LEADING_KEYWORDS = (
+    "SELECT", "INSERT", "UPDATE", "DELETE", "CREATE",
+    "DROP", "SET", "ALTER", "BEGIN", "WITH", "SHOW", "DESCRIBE",
+)
+_BYPASS_KEYWORDS = ("SHOW ", "DESCRIBE ", "CREATE ", "DROP ", "ALTER ",
+                    "TRUNCATE ", "GRANT ", "REVOKE ")
+# Only this many leading characters are upper-cased for the keyword tests
+_HEAD = max(map(len, _LEADING_KEYWORDS + _BYPASS_KEYWORDS))
+
+
 def extract_sql(text: str) -> str | None:
     """
     Extracts the first valid SQL statement from AI output.
@@ -19,25 +38,35 @@ def extract_sql(text: str) -> str | None:
     """
     if not text:
         return None
+    # Retries and repeated answers hand in identical text; very long
+    # responses are not worth pinning in the cache
+    if len(text) > _EXTRACT_MEMO_LIMIT:
+        return _extract_sql(text)
+    return _extract_sql_cached(text)
+
 
+def _extract_sql(text: str) -> str | None:
     # 1. Try markdown fences first
-    for pattern in (r"```sql\s*(.*?)\s*```", r"```\s*(.*?)\s*```"):
-        m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+    for pattern in _FENCE_PATTERNS:
+        m = pattern.search(text)
         if m:
             return m.group(1).strip()
 
     # 2. Raw SQL – strip trailing hallucinations
     clean = text.strip()
-    keywords = (
-        "SELECT", "INSERT", "UPDATE", "DELETE", "CREATE",
-        "DROP", "SET", "ALTER", "BEGIN", "WITH", "SHOW", "DESCRIBE",
-    )
-    if clean.upper().startswith(keywords):
+    if clean[:_HEAD].upper().startswith(_LEADING_KEYWORDS):
+        # Walk the statements in place; only the kept ones are sliced out
         valid = []
-        for stmt in clean.split(";"):
-            stmt = stmt.strip()
-            if stmt and stmt.upper().startswith(keywords):
-                valid.append(stmt)
+        pos, size = 0, len(clean)
+        while pos < size:
+            stop = clean.find(";", pos)
+            if stop == -1:
+                stop = size
+            while pos < stop and clean[pos].isspace():
+                pos += 1
+            if clean[pos:min(pos + _HEAD, stop)].upper().startswith(_LEADING_KEYWORDS):
+                valid.append(clean[pos:stop].rstrip())
+            pos = stop + 1
         if valid:
             return ";\n".join(valid) + ";"
         return clean
@@ -45,20 +74,35 @@ def extract_sql(text: str) -> str | None:
     return None
 
 
+_EXTRACT_MEMO_LIMIT = 32_768
+_extract_sql_cached = lru_cache(maxsize=128)(_extract_sql)
+
+
+def _columns(tbl_data) -> frozenset:
+    """Column names of a schema_map entry, stored either as a list or a dict."""
+    return frozenset(tbl_data if isinstance(tbl_data, list) else tbl_data.get("columns", []))
+
+
+@lru_cache(maxsize=128)
+def _parse(sql_code: str) -> Parser:
+    """
+    Shared sql_metadata Parser per SQL string. Parser memoises .tables and
+    .columns itself, so a retry that re-validates the same SQL parses nothing.
+    """
+    return Parser(sql_code)
+
+
 def validate_sql_schema(sql_code: str, schema_map: dict) -> bool:
     """
     Validates tables and columns against the known schema.
     Bypasses validation for DDL and admin commands.
     """
-    upper = sql_code.strip().upper()
-
     # Fast-pass for DDL / admin commands
-    if upper.startswith(("SHOW ", "DESCRIBE ", "CREATE ", "DROP ", "ALTER ",
-                          "TRUNCATE ", "GRANT ", "REVOKE ")):
+    if sql_code.lstrip()[:_HEAD].upper().startswith(_BYPASS_KEYWORDS):
         return True
 
     try:
-        parser = Parser(sql_code)
+        parser = _parse(sql_code)
         sql_tables = parser.tables
 
         # Validate tables
@@ -67,25 +111,25 @@ def validate_sql_schema(sql_code: str, schema_map: dict) -> bool:
                 console.print(f"[red]Validation Error:[/red] Table '{table}' not found in schema.")
                 return False
 
+        # Column sets of the referenced tables, built once per validation
+        table_cols = {table: _columns(schema_map[table]) for table in sql_tables}
+
         # Validate columns
         for col_ref in parser.columns:
             if "(" in col_ref or "*" in col_ref:
                 continue
             if "." in col_ref:
                 tbl, col = col_ref.split(".", 1)
-                tbl_cols = schema_map.get(tbl, {})
-                actual_cols = tbl_cols if isinstance(tbl_cols, list) else tbl_cols.get("columns", [])
-                if tbl in schema_map and col not in actual_cols:
+                if tbl not in schema_map:
+                    continue
+                actual_cols = table_cols.get(tbl)
+                if actual_cols is None:
+                    actual_cols = table_cols[tbl] = _columns(schema_map[tbl])
+                if col not in actual_cols:
                     console.print(f"[red]Validation Error:[/red] Column '{col}' not in table '{tbl}'.")
                     return False
             else:
-                found = False
-                for tbl in sql_tables:
-                    tbl_data = schema_map.get(tbl, {})
-                    cols = tbl_data if isinstance(tbl_data, list) else tbl_data.get("columns", [])
-                    if col_ref in cols:
-                        found = True
-                        break
+                found = any(col_ref in table_cols[tbl] for tbl in sql_tables)
                 if not found and sql_tables:
                     console.print(f"[red]Validation Error:[/red] Column '{col_ref}' not found.")
                     return False
@@ -99,13 +143,8 @@ def validate_sql_schema(sql_code: str, schema_map: dict) -> bool:
 
 def validate_plot_sql(sql: str) -> bool:
     """Ensures plotting SQL returns exactly 2 columns with an aggregate."""
-    if not sql.upper().strip().startswith("SELECT"):
-        return False
-    try:
-        select_part = sql.upper().split("FROM")[0]
-        columns = select_part.replace("SELECT", "").split(",")
-        if len(columns) != 2:
-            return False
-        return any(k in columns[1] for k in ("COUNT", "SUM", "AVG", "MIN", "MAX"))
-    except Exception:
+    m = _PLOT_RE.match(sql)
+    if not m:
         return False
+    columns = m.group(1).split(",")
+    return len(columns) == 2 and _AGGREGATE_RE.search(columns[1]) is not None